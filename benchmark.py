@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# Time the read and render paths of bpview.py without a display on synthetic BP files, and print the
+# timings as JSON so that runs can be compared:
+#   python3 benchmark.py --engine BP4 BP5 --shape [512,512] --steps 20 -o results.json
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import numpy as np
+import adios2
+import matplotlib.pyplot as plt
+import bpview
+import bpview_reader
+
+
+# Write variables v0, v1, ... with the same global shape over a number of steps. Every step of a variable
+# is written as blocks along its first dimension, like the ranks of a simulation would write it.
+def write_synthetic(output, engine, variables, shape, steps, blocks, dtype):
+    adios = adios2.ADIOS()
+    io = adios.DeclareIO("Synthetic")
+    io.SetEngine(engine)
+
+    dtype = np.dtype(dtype)
+    bounds = np.linspace(0, shape[0], blocks + 1).astype(int)
+    var_list = [io.DefineVariable("v" + str(v), np.zeros(1, dtype=dtype), shape, [0] * len(shape), shape)
+                for v in range(variables)]
+    base = (np.arange(int(np.prod(shape))) % 1000).reshape(shape)
+
+    fw = io.Open(output, adios2.Mode.Write)
+    for step in range(steps):
+        fw.BeginStep()
+        for v, var in enumerate(var_list):
+            data = (base + step + v).astype(dtype)
+            for first, last in zip(bounds[:-1], bounds[1:]):
+                if first == last:
+                    continue
+                var.SetSelection([[int(first)] + [0] * (len(shape) - 1), [int(last - first)] + list(shape[1:])])
+                fw.Put(var, np.ascontiguousarray(data[first:last]), adios2.Mode.Sync)
+        fw.EndStep()
+    fw.Close()
+
+
+# Size in bytes of a file or of all files in a BP directory
+def path_bytes(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+# Smallest and median time of repeated calls
+def timed(function, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {"min_s": min(times), "median_s": statistics.median(times), "repeats": repeats}
+
+
+# Time the paths of bpview.py on one file. The selections are a line and a plane through the first two
+# dimensions of v0 at the middle of the other dimensions.
+def run_benchmarks(bp_file, variables, shape, steps, repeats, index_dir):
+    results = {}
+    dim = len(shape)
+    middle = [s // 2 for s in shape]
+    line_start = np.array([0] + middle[1:])
+    line_count = np.array([shape[0]] + [1] * (dim - 1))
+    if dim > 1:
+        plane_start = np.array([0, 0] + middle[2:])
+        plane_count = np.array(shape[:2] + [1] * (dim - 2))
+    step = steps // 2
+
+    # Startup: the catalog of variables without and with the index
+    def open_catalog(use_index):
+        bpview_reader.index_dir = index_dir if use_index else None
+        with bpview_reader.BPViewReader(bp_file, name="Catalog") as reader:
+            bpview.VariableCatalog(reader.variables)
+            reader.blocks("v0")
+
+    results["catalog_no_index"] = timed(lambda: open_catalog(False), repeats)
+    open_catalog(True)
+    results["catalog_indexed"] = timed(lambda: open_catalog(True), repeats)
+
+    adios = adios2.ADIOS()
+    io = adios.DeclareIO("Benchmark")
+    fr = io.Open(bp_file, adios2.Mode.ReadRandomAccess)
+    var = io.InquireVariable("v0")
+
+    # Single steps
+    results["read_1d_step"] = timed(lambda: bpview.read_step(fr, var, step, line_start, line_count, [shape[0]]), repeats)
+    if dim > 1:
+        results["read_2d_step"] = timed(lambda: bpview.read_step(fr, var, step, plane_start, plane_count, shape[:2]), repeats)
+        strides = [max(1, -(-s // 512)) for s in shape[:2]]
+        results["read_2d_step_lod"] = timed(lambda: bpview.read_step_strided(fr, var, step, plane_start, plane_count, [0, 1], strides), repeats)
+
+    # Series: every step one after another and in batched multi-step reads
+    if dim > 1:
+        series_start, series_count, series_shape = plane_start, plane_count, shape[:2]
+    else:
+        series_start, series_count, series_shape = line_start, line_count, [shape[0]]
+    results["series_per_step"] = timed(lambda: [bpview.read_step(fr, var, s, series_start, series_count, series_shape) for s in range(steps)], repeats)
+    results["series_batched"] = timed(lambda: list(bpview.iter_steps(fr, var, 0, steps, series_start, series_count, series_shape)), repeats)
+
+    # The same series read into one array through the reader API of notebooks
+    with bpview_reader.BPViewReader(bp_file, name="Reader") as reader:
+        results["series_reader"] = timed(lambda: reader.read("v0", None, series_start, series_count), repeats)
+
+    # All variables of a view with one PerformGets
+    selections = [bpview.ViewSelection(io.InquireVariable("v" + str(v)), 0, line_start, line_count, [shape[0]]) for v in range(variables)]
+    results["view_all_variables"] = timed(lambda: list(bpview.iter_view_steps(fr, selections, 0, steps)), repeats)
+
+    # Data display: one page of rows read and formatted
+    paged = bpview.PagedSelection(fr, var, 0, steps, np.zeros(dim, dtype=int), np.array(shape))
+
+    def display_page():
+        paged.cache.clear()
+        data = paged.get(0, 20, 0, min(8, paged.cols))
+        paged.lines(0, 0, data)
+
+    results["display_page"] = timed(display_page, repeats)
+
+    # Statistics of the whole variable
+    results["statistics"] = timed(lambda: bpview.reduce_variable(fr, var, 0, steps, np.zeros(dim, dtype=int), np.array(shape)), repeats)
+
+    # Figures drawn to an Agg canvas
+    line_data = bpview.read_step(fr, var, step, line_start, line_count, [shape[0]])
+    fig, ax, line, title = bpview.make_1d_figure("x-axis", "Values")
+    decimated_line = bpview.DecimatedLine(None, ax, line)
+
+    def render_1d():
+        decimated_line.set_data(np.arange(shape[0]), line_data)
+        bpview.autoscale_changed(ax)
+        fig.canvas.draw()
+
+    results["render_1d"] = timed(render_1d, repeats)
+    plt.close(fig)
+
+    if dim > 1:
+        plane_data = bpview.read_step(fr, var, step, plane_start, plane_count, shape[:2])
+        fig, ax, colorax, title = bpview.make_2d_figure(plane_start, plane_count, [0, 1])
+
+        def render_2d():
+            bpview.set_lod_image(colorax, plane_data, plane_start, plane_count, [0, 1])
+            colorax.autoscale()
+            fig.canvas.draw()
+
+        results["render_2d"] = timed(render_2d, repeats)
+        plt.close(fig)
+
+    fr.Close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", nargs="+", default=["BP5"], choices=["BP4", "BP5"], help="Engines of the synthetic files")
+    parser.add_argument("--variables", type=int, default=4, help="Number of variables")
+    parser.add_argument("--shape", default="[256,256]", help="Global shape of every variable, e.g. [64,512,512]")
+    parser.add_argument("--steps", type=int, default=10, help="Number of steps")
+    parser.add_argument("--blocks", type=int, default=4, help="Blocks every step of a variable is written in, along the first dimension")
+    parser.add_argument("--dtype", default="float64", help="NumPy dtype of the variables, e.g. float32 or int16")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed calls of every path")
+    parser.add_argument("--dir", help="Directory of the synthetic files, by default a temporary directory removed afterwards")
+    parser.add_argument("--output", "-o", help="JSON file of the results, by default printed")
+    args = parser.parse_args()
+
+    plt.switch_backend("Agg")
+    shape = [int(s) for s in eval(args.shape)]
+    work_dir = args.dir if args.dir is not None else tempfile.mkdtemp(prefix="bpview-benchmark-")
+    os.makedirs(work_dir, exist_ok=True)
+    index_dir = os.path.join(work_dir, "index")
+
+    report = {
+        "adios2_version": getattr(adios2, "__version__", None),
+        "config": {"variables": args.variables, "shape": shape, "steps": args.steps, "blocks": args.blocks,
+                   "dtype": args.dtype, "repeats": args.repeats},
+        "engines": {},
+    }
+    try:
+        for engine in args.engine:
+            bp_file = os.path.join(work_dir, "synthetic-" + engine.lower() + ".bp")
+            start = time.perf_counter()
+            write_synthetic(bp_file, engine, args.variables, shape, args.steps, args.blocks, args.dtype)
+            write_s = time.perf_counter() - start
+            report["engines"][engine] = {
+                "file": bp_file,
+                "file_bytes": path_bytes(bp_file),
+                "write_s": write_s,
+                "results": run_benchmarks(bp_file, args.variables, shape, args.steps, args.repeats, index_dir),
+            }
+    finally:
+        if args.dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
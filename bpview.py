@@ -1,14 +1,27 @@
 #!/usr/bin/env python3
 import argparse
+import gc
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import tkinter as tk
 from tkinter import filedialog
 import numpy as np
 import adios2
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from tkinter import ttk
-from tkinter import scrolledtext
+import bpview_reader
+from bpview_reader import (BPViewReader, ReadBudgetError, StepCache, TraceStats, ViewSelection, adios_dtypes, check_read_budget,
+                           check_selection, engine_lock, is_local_array, iter_steps, iter_view_steps, read_planes, read_step,
+                           read_step_decimated, read_step_strided, read_steps, read_view_step, select, tracer, var_dtype, var_shape)
 
 
 # Load BP file
@@ -18,17 +31,1523 @@ def load_bp_file():
         return file_path
 
 
+# Memory budget in bytes of the step cache of each series window
+cache_budget = 256 * 1024 * 1024
+
+# Number of steps read ahead of the current step in series windows
+prefetch_depth = 4
+
+# Planes kept in the cache of a slice browser at most
+slice_cache_planes = 16
+
+
+# Values matplotlib can draw: the magnitude of complex data and double precision instead of long double
+def plottable(data):
+    if np.iscomplexobj(data):
+        with tracer.span("magnitude", "convert", elements=int(data.size), dtype=str(data.dtype)):
+            return np.abs(data)
+    if data.dtype == np.longdouble:
+        with tracer.span("to_float64", "convert", elements=int(data.size), dtype=str(data.dtype)):
+            return data.astype(np.float64)
+    return data
+
+
+# Rows of a probe heatmap at most, consecutive steps beyond it are averaged into one row
+probe_rows = 2048
+
+
+# Read a point or a line of a variable over a step range with one multi-step read per batch of steps.
+# Returns the first step of each row and a [rows, *data_shape] array. Without a row limit every step is a
+# row, otherwise groups of consecutive steps are averaged into one row so that the result stays small on
+# runs with many steps while the reads stay bounded by the batch budget.
+def read_probe(fr, var, step_start, step_count, sel_start, sel_count, data_shape, rows=None, block=None):
+    group = 1 if rows is None else max(1, -(-step_count // rows))
+    row_count = -(-step_count // group)
+    row_steps = step_start + np.arange(row_count) * group
+    if group == 1:
+        check_read_budget([step_count] + list(data_shape), var_dtype(var))
+        values = np.empty([step_count] + list(data_shape), dtype=var_dtype(var))
+        for _ in read_steps(fr, var, step_start, step_count, sel_start, sel_count, data_shape, block, values):
+            pass
+        return row_steps, values
+
+    dtype = np.result_type(var_dtype(var), np.float64)
+    check_read_budget([row_count] + list(data_shape), dtype)
+    sums = np.zeros([row_count] + list(data_shape), dtype=dtype)
+    for first, batch in read_steps(fr, var, step_start, step_count, sel_start, sel_count, data_shape, block):
+        rows_of_batch = (np.arange(first, first + len(batch)) - step_start) // group
+        for row in range(rows_of_batch[0], rows_of_batch[-1] + 1):
+            sums[row] += batch[rows_of_batch == row].sum(axis=0)
+    counts = np.minimum(group, step_count - np.arange(row_count) * group)
+    return row_steps, sums / counts.reshape([row_count] + [1] * len(data_shape))
+
+
+# Memory budget in bytes of one chunk of a reduction, a chunk per thread is reduced at the same time
+stats_chunk_budget = 64 * 1024 * 1024
+
+# Threads reducing the chunks of a variable
+stats_threads = min(8, os.cpu_count() or 1)
+
+# Percentiles shown in the statistics of a variable
+stats_percentiles = [1, 5, 25, 50, 75, 95, 99]
+
+
+# Count, mean and sum of squared deviations of values, merged over chunks with the parallel form of
+# Welford's algorithm so that the variance stays accurate over any number of chunks
+class Moments:
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(self, values):
+        if len(values) == 0:
+            return
+        chunk = Moments()
+        chunk.count = len(values)
+        chunk.mean = float(values.mean())
+        chunk.m2 = float(np.sum((values - chunk.mean) ** 2))
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        self.merge(chunk)
+
+    def merge(self, other):
+        count = self.count + other.count
+        if other.count == 0:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def std(self):
+        return np.sqrt(self.m2 / self.count) if self.count else np.nan
+
+
+# Merging t-digest of values for approximate quantiles in bounded memory. Sorted values are merged into
+# centroids that span at most one unit of the arcsine scale, small at the tails and large in the middle.
+class TDigest:
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(self, values, weights=None):
+        if len(values) == 0:
+            return
+        if weights is None:
+            weights = np.ones(len(values))
+        self.min = min(self.min, float(np.min(values)))
+        self.max = max(self.max, float(np.max(values)))
+        means = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind="stable")
+        means = means[order]
+        weights = weights[order]
+        q = (np.cumsum(weights) - weights / 2) / weights.sum()
+        k = np.floor(self.compression * (np.arcsin(2 * q - 1) / np.pi + 0.5))
+        starts = np.flatnonzero(np.diff(k, prepend=-1))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def merge(self, other):
+        if len(other.means):
+            self.add(other.means, other.weights)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        if not len(self.means):
+            return np.nan
+        total = self.weights.sum()
+        centers = np.concatenate([[0], np.cumsum(self.weights) - self.weights / 2, [total]])
+        means = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * total, centers, means))
+
+
+# Statistics of a selection over steps: moments and quantiles of the finite values, counts of NaN and
+# infinite values, and the L2 norm and largest magnitude of every step. Complex values count by magnitude.
+class Statistics:
+    def __init__(self):
+        self.moments = Moments()
+        self.digest = TDigest()
+        self.nan_count = 0
+        self.inf_count = 0
+        self.step_norms = {}  # step -> [sum of squares, largest magnitude]
+
+    # Add a chunk of the data of consecutive steps from first_step on, shaped [steps, ...]
+    def add(self, first_step, data):
+        values = plottable(data).reshape(len(data), -1).astype(np.float64, copy=False)
+        finite = np.isfinite(values)
+        nan_count = int(np.isnan(values).sum())
+        self.nan_count += nan_count
+        self.inf_count += values.size - int(finite.sum()) - nan_count
+        kept = values[finite]
+        self.moments.add(kept)
+        self.digest.add(kept)
+        values = np.where(finite, values, 0)
+        for i, row in enumerate(values):
+            norms = self.step_norms.setdefault(first_step + i, [0.0, 0.0])
+            norms[0] += float(np.dot(row, row))
+            norms[1] = max(norms[1], float(np.abs(row).max()) if row.size else 0.0)
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.digest.merge(other.digest)
+        self.nan_count += other.nan_count
+        self.inf_count += other.inf_count
+        for step, (squares, largest) in other.step_norms.items():
+            norms = self.step_norms.setdefault(step, [0.0, 0.0])
+            norms[0] += squares
+            norms[1] = max(norms[1], largest)
+
+    # Steps and their L2 norms and largest magnitudes
+    def norms(self):
+        steps = np.array(sorted(self.step_norms), dtype=int)
+        l2 = np.array([np.sqrt(self.step_norms[step][0]) for step in steps])
+        largest = np.array([self.step_norms[step][1] for step in steps])
+        return steps, l2, largest
+
+    def lines(self):
+        lines = ["Values: " + str(self.moments.count + self.nan_count + self.inf_count),
+                 "NaN: " + str(self.nan_count),
+                 "Inf: " + str(self.inf_count),
+                 "Min: " + str(self.moments.min if self.moments.count else np.nan),
+                 "Max: " + str(self.moments.max if self.moments.count else np.nan),
+                 "Mean: " + str(self.moments.mean if self.moments.count else np.nan),
+                 "Std: " + str(self.moments.std())]
+        for p in stats_percentiles:
+            lines.append("Percentile " + str(p) + ": " + str(self.digest.quantile(p / 100)))
+        return lines
+
+
+def chunk_statistics(first_step, data):
+    stats = Statistics()
+    stats.add(first_step, data)
+    return stats
+
+
+# Read a step range of a selection in chunks of at most the budget: several steps per chunk when steps
+# are small, slabs along the first dimension of the selection when one step does not fit. Yields the
+# first step of each chunk and its [steps, ...] array.
+def read_chunks(fr, var, step_start, step_count, sel_start, sel_count, block=None, budget=None):
+    if budget is None:
+        budget = stats_chunk_budget
+    dtype = var_dtype(var)
+    data_shape = [int(c) for c in sel_count]
+    step_bytes = int(np.prod(data_shape)) * dtype.itemsize
+    if step_bytes <= budget or not data_shape or data_shape[0] == 1:
+        batch = 1 if block is not None else max(1, min(step_count, budget // max(step_bytes, 1)))
+        for first in range(step_start, step_start + step_count, batch):
+            count = min(batch, step_start + step_count - first)
+            check_read_budget([count] + data_shape, dtype)
+            data = np.empty([count] + data_shape, dtype=dtype)
+            with engine_lock, tracer.span("get_chunk", "io", var=var.Name(), step=int(first), steps=int(count), bytes=data.nbytes, elements=int(data.size), dtype=str(dtype)):
+                select(var, first, count, sel_start, sel_count, block)
+                fr.Get(var, data, adios2.Mode.Sync)
+            yield first, data
+        return
+
+    rows = max(1, budget // (step_bytes // data_shape[0]))
+    slab_start = np.array(sel_start)
+    slab_count = np.array(sel_count)
+    for step in range(step_start, step_start + step_count):
+        for row in range(0, data_shape[0], rows):
+            slab_start[0] = sel_start[0] + row
+            slab_count[0] = min(rows, data_shape[0] - row)
+            yield step, read_step(fr, var, step, slab_start, slab_count, slab_count, block)[np.newaxis]
+
+
+# Bins of histograms
+histogram_bins = 100
+
+
+# Bin edges of the histogram of a selection over a step range, from the minima and maxima of the blocks
+# in the metadata when they are known, otherwise from a pass over the data. Complex values are binned by
+# magnitude, which the metadata does not give.
+def histogram_edges(fr, var, layout, step_start, step_count, sel_start, sel_count, block=None, bins=None):
+    if bins is None:
+        bins = histogram_bins
+    low = high = np.nan
+    if layout is not None and var_dtype(var).kind != "c":
+        mins, maxs = layout.selection_minmax(step_start, step_count, sel_start, sel_count, block)
+        low = np.fmin.reduce(mins)
+        high = np.fmax.reduce(maxs)
+    if not (np.isfinite(low) and np.isfinite(high)):
+        low, high = np.inf, -np.inf
+        for _, data in read_chunks(fr, var, step_start, step_count, sel_start, sel_count, block):
+            values = plottable(data)
+            values = values[np.isfinite(values)]
+            if values.size:
+                low = min(low, float(values.min()))
+                high = max(high, float(values.max()))
+        if low > high:
+            low, high = 0.0, 1.0
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return np.linspace(low, high, bins + 1)
+
+
+# Histogram of a selection over a step range, streamed chunk by chunk through np.histogram with fixed bins
+# so that memory stays constant. Returns the counts over all steps, or the counts of each step as a
+# [steps, bins] array. NaN, infinite values and values outside the bins are not counted.
+def read_histogram(fr, var, step_start, step_count, sel_start, sel_count, edges, block=None, per_step=False):
+    counts = np.zeros([step_count if per_step else 1, len(edges) - 1], dtype=np.int64)
+    for first, data in read_chunks(fr, var, step_start, step_count, sel_start, sel_count, block):
+        values = plottable(data).reshape(len(data), -1)
+        if not per_step:
+            counts[0] += np.histogram(values[np.isfinite(values)], edges)[0]
+            continue
+        for i, row in enumerate(values):
+            counts[first - step_start + i] += np.histogram(row[np.isfinite(row)], edges)[0]
+    return counts if per_step else counts[0]
+
+
+# Title of a histogram of a selection at a step or over a step range
+def histogram_title(var_name, sel_start, sel_count, step_start, step_count):
+    steps = "step " + str(step_start) if step_count == 1 else "steps " + str(step_start) + " to " + str(step_start + step_count - 1)
+    return "Histogram of variable " + var_name + " with start " + str(sel_start) + " and count " + str(sel_count) + ", " + steps
+
+
+# Statistics of a selection over a step range, read chunk by chunk while a pool of threads reduces the
+# chunks read before. At most one chunk per thread waits to be reduced, so memory stays bounded.
+# progress is called with the number of steps read, setting cancel stops the reduction.
+def reduce_variable(fr, var, step_start, step_count, sel_start, sel_count, block=None, threads=None, progress=None, cancel=None):
+    if threads is None:
+        threads = stats_threads
+    stats = Statistics()
+    pending = []
+    with ThreadPoolExecutor(threads) as pool:
+        for first, data in read_chunks(fr, var, step_start, step_count, sel_start, sel_count, block):
+            if cancel is not None and cancel.is_set():
+                break
+            pending.append(pool.submit(chunk_statistics, first, data))
+            if len(pending) >= threads:
+                stats.merge(pending.pop(0).result())
+            if progress is not None:
+                progress(first + len(data) - step_start)
+        for future in pending:
+            stats.merge(future.result())
+    return stats
+
+
+# Read 2D plots at about the resolution of their canvas instead of the full selection
+lod_enabled = True
+
+# Values along each counted dimension of a 2D plot at most read at the resolution of the canvas
+lod_pixels = 1024
+
+
+# Part of a 2D selection visible in axes, and the strides of its two counted dimensions giving about one
+# value per pixel of the axes, and at least the minimum strides
+def lod_selection(ax, sel_start, sel_count, count_dim, min_strides=(1, 1)):
+    sel_end = sel_start + sel_count
+    lod_start = np.array(sel_start)
+    lod_count = np.array(sel_count)
+    bbox = ax.get_window_extent()
+    lod_strides = [1, 1]
+    for i, (limits, pixels) in enumerate([(ax.get_ylim(), bbox.height), (ax.get_xlim(), bbox.width)]):
+        d = count_dim[i]
+        first = min(max(int(np.floor(min(limits))), sel_start[d]), sel_end[d] - 1)
+        last = max(min(int(np.ceil(max(limits))), sel_end[d]), first + 1)
+        lod_start[d] = first
+        lod_count[d] = last - first
+        if lod_enabled:
+            lod_strides[i] = max(1, int(np.ceil(lod_count[d] / max(pixels, 1))))
+        lod_strides[i] = max(lod_strides[i], min_strides[i])
+    return lod_start, lod_count, lod_strides
+
+
+# Cost of reading a selection over a step range and, when it does not fit in the read budget, cheaper
+# ways to read it: every n-th value, a few steps at a time, or only the first steps.
+class ReadPlan:
+    def __init__(self, var, sel_start, sel_count, step_count, lod=False, shape=None):
+        if shape is None:
+            shape = var.Shape()
+        check_selection(var.Name(), sel_start, sel_count, shape)
+        sel_start = [int(i) for i in sel_start]
+        sel_count = [int(i) for i in sel_count]
+
+        itemsize = var_dtype(var).itemsize
+        self.count_dim = [i for i in range(len(sel_count)) if sel_count[i] != 1]
+        # 2D plots read at about the resolution of the canvas
+        counts = [min(c, lod_pixels) if lod and i in self.count_dim else c for i, c in enumerate(sel_count)]
+        self.step_bytes = int(np.prod(counts)) * itemsize
+        self.step_count = step_count
+        self.nbytes = self.step_bytes * step_count
+        self.fits = self.nbytes <= bpview_reader.read_budget
+
+        # Every n-th value along the counted dimensions, so that all steps fit together
+        self.strides = [1] * len(self.count_dim)
+        while self.count_dim and int(np.prod([len(range(0, counts[d], s)) for d, s in zip(self.count_dim, self.strides)])) * itemsize * step_count > bpview_reader.read_budget:
+            if all(s >= counts[d] for d, s in zip(self.count_dim, self.strides)):
+                break
+            self.strides = [min(s * 2, counts[d]) for d, s in zip(self.count_dim, self.strides)]
+
+        # Steps that fit together, series are read a step or a batch at a time when at least one fits
+        self.chunk_steps = min(step_count, bpview_reader.read_budget // max(self.step_bytes, 1))
+
+    def describe(self):
+        return "Reading this selection needs " + str(self.nbytes // 2**20) + " MB, more than the read budget of " + str(bpview_reader.read_budget // 2**20) + " MB."
+
+
+# Ask how to read a selection that does not fit in the read budget. Paged views and series of which one
+# step fits are read without asking, so what is asked about is a step too large for the budget, of which
+# only every n-th value can be read. Returns "decimated" or None to not read it.
+def ask_read_plan(master, plan):
+    dialog = tk.Toplevel(master)
+    dialog.title("Selection too large")
+    choice = [None]
+
+    def choose(value):
+        choice[0] = value
+        dialog.destroy()
+
+    tk.Label(dialog, text=plan.describe()).pack(side=tk.TOP, padx=5, pady=5)
+    if plan.count_dim:
+        ttk.Button(dialog, text="Read every " + " x ".join(str(s) for s in plan.strides) + "-th value",
+                   command=lambda: choose("decimated")).pack(side=tk.TOP, fill=tk.X, padx=5)
+    ttk.Button(dialog, text="Cancel", command=dialog.destroy).pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+
+    dialog.transient(master)
+    dialog.grab_set()
+    master.wait_window(dialog)
+    return choice[0]
+
+
+# Show data read from part of a 2D selection in an image, keeping the axes limits
+def set_lod_image(image, data, lod_start, lod_count, count_dim):
+    with tracer.span("image", "render", elements=int(data.size)):
+        set_image_data(image, data, lod_start, lod_count, count_dim)
+
+
+def set_image_data(image, data, lod_start, lod_count, count_dim):
+    ax = image.axes
+    xlim = ax.get_xlim()
+    ylim = ax.get_ylim()
+    image.set_data(plottable(data))
+    image.set_extent([lod_start[count_dim[1]], lod_start[count_dim[1]] + lod_count[count_dim[1]],
+                      lod_start[count_dim[0]], lod_start[count_dim[0]] + lod_count[count_dim[0]]])
+    ax.set_xlim(xlim, emit=False)
+    ax.set_ylim(ylim, emit=False)
+
+
+# Call update once the limits of axes stopped changing, e.g. after zooming or panning with the toolbar
+def on_limits_settled(window, ax, update, delay=250):
+    pending = [None]
+
+    def settled():
+        pending[0] = None
+        if window.winfo_exists():
+            update()
+
+    def changed(ax):
+        if pending[0] is not None:
+            window.after_cancel(pending[0])
+        pending[0] = window.after(delay, settled)
+
+    ax.callbacks.connect("xlim_changed", changed)
+    ax.callbacks.connect("ylim_changed", changed)
+
+
+# Indices of the points kept when decimating arrays to a number of buckets: the first and last point and
+# the minimum and maximum of each array in every bucket, so that spikes stay visible
+def minmax_indices(arrays, buckets):
+    n = len(arrays[0])
+    if n <= 4 * buckets:
+        return np.arange(n)
+    size = int(np.ceil(n / buckets))
+    full = n - n % size
+    offsets = np.arange(0, full, size)
+    keep = [np.array([0, n - 1])]
+    for a in arrays:
+        rows = a[:full].reshape(-1, size)
+        keep.append(offsets + np.argmin(rows, axis=1))
+        keep.append(offsets + np.argmax(rows, axis=1))
+        if full < n:
+            keep.append(full + np.array([np.argmin(a[full:]), np.argmax(a[full:])]))
+    return np.unique(np.concatenate(keep))
+
+
+# Line of a 1D plot drawn from a min/max decimation of its data to about the width of the axes.
+# In a window, the visible range is decimated again once zooming or panning settles.
+class DecimatedLine:
+    def __init__(self, window, ax, line):
+        self.ax = ax
+        self.line = line
+        self.x = None
+        self.y = None
+        self.monotonic = True
+        if window is not None:
+            on_limits_settled(window, ax, self.redecimate)
+
+    def set_data(self, x, y):
+        self.x = plottable(x)
+        self.y = plottable(y)
+        self.monotonic = len(x) < 2 or bool(np.all(np.diff(self.x) >= 0))
+        self.line.set_data(*self.decimate(0, len(x), 1))
+
+    # Decimate the points between first and last, using more buckets when only a fraction of them is visible
+    def decimate(self, first, last, zoom):
+        with tracer.span("decimate", "render", elements=int(last - first)):
+            buckets = int(max(1, self.ax.get_window_extent().width) * zoom)
+            arrays = [self.y[first:last]] if self.monotonic else [self.y[first:last], self.x[first:last]]
+            keep = first + minmax_indices(arrays, buckets)
+            return self.x[keep], self.y[keep]
+
+    def redecimate(self):
+        if self.x is None or len(self.x) == 0:
+            return
+        xmin, xmax = sorted(self.ax.get_xlim())
+        if self.monotonic:
+            first = max(int(np.searchsorted(self.x, xmin, "left")) - 1, 0)
+            last = min(int(np.searchsorted(self.x, xmax, "right")) + 1, len(self.x))
+            self.line.set_data(*self.decimate(first, last, 1))
+        else:
+            x_range = np.nanmax(self.x) - np.nanmin(self.x)
+            zoom = x_range / (xmax - xmin) if xmax > xmin and x_range > 0 else 1
+            self.line.set_data(*self.decimate(0, len(self.x), max(zoom, 1)))
+        self.ax.figure.canvas.draw_idle()
+
+
+# Rows and values per row of one page of the nD display
+page_rows = 64
+page_cols = 16
+
+# Pages of the nD display kept in memory
+page_cache_pages = 16
+
+
+# Selection of a variable over a step range seen as a table with one row per line along its last dimension.
+# Rows and columns are read one page at a time, and recently used pages are cached.
+class PagedSelection:
+    def __init__(self, fr, var, step_start, step_count, sel_start, sel_count, block=None):
+        self.fr = fr
+        self.var = var
+        self.block = block
+        self.dtype = var_dtype(var)
+        self.step_start = step_start
+        self.sel_start = np.array(sel_start, dtype=int)
+        self.sel_count = np.array(sel_count, dtype=int)
+        self.row_shape = [int(c) for c in self.sel_count[:-1]]
+        self.rows_per_step = int(np.prod(self.row_shape))
+        self.rows = step_count * self.rows_per_step
+        self.cols = int(self.sel_count[-1]) if len(self.sel_count) else 1
+        self.cache = StepCache(page_cache_pages * page_rows * page_cols * self.dtype.itemsize)
+
+    # Step and indices of the leading dimensions of a row
+    def row_index(self, row):
+        step, rest = divmod(row, self.rows_per_step)
+        index = [int(i) for i in np.unravel_index(rest, self.row_shape)] if self.row_shape else []
+        return self.step_start + step, index
+
+    def row_label(self, row, first_col):
+        step, index = self.row_index(row)
+        if not len(self.sel_count):
+            return "step " + str(step) + ": "
+        start = self.sel_start + np.array(index + [first_col])
+        return "step " + str(step) + " " + str([int(i) for i in start]) + ": "
+
+    # Text of rows read by get, one line per row with its step and start
+    def lines(self, first_row, first_col, data):
+        return [self.row_label(first_row + r, first_col) + np.array2string(data[r], precision=5, separator=', ', max_line_width=np.inf)
+                for r in range(len(data))]
+
+    # Values of rows [first_row, first_row + row_count) and columns [first_col, first_col + col_count)
+    def get(self, first_row, row_count, first_col, col_count):
+        data = np.empty([row_count, col_count], dtype=self.dtype)
+        for page_row in range(first_row // page_rows, (first_row + row_count - 1) // page_rows + 1):
+            for page_col in range(first_col // page_cols, (first_col + col_count - 1) // page_cols + 1):
+                page = self.page(page_row, page_col)
+                rows = slice(max(first_row, page_row * page_rows), min(first_row + row_count, (page_row + 1) * page_rows))
+                cols = slice(max(first_col, page_col * page_cols), min(first_col + col_count, (page_col + 1) * page_cols))
+                data[rows.start - first_row:rows.stop - first_row, cols.start - first_col:cols.stop - first_col] = \
+                    page[rows.start - page_row * page_rows:rows.stop - page_row * page_rows,
+                         cols.start - page_col * page_cols:cols.stop - page_col * page_cols]
+        return data
+
+    def page(self, page_row, page_col):
+        cached = self.cache.get((page_row, page_col))
+        if cached is not None:
+            return cached[0]
+
+        first_row = page_row * page_rows
+        row_count = min(page_rows, self.rows - first_row)
+        first_col = page_col * page_cols
+        col_count = min(page_cols, self.cols - first_col)
+        data = np.empty([row_count, col_count], dtype=self.dtype)
+        start = self.sel_start.copy()
+        count = self.sel_count.copy()
+        if len(count):
+            start[-1] += first_col
+            count[-1] = col_count
+
+        if self.rows_per_step == 1:
+            # Every row is the same line at another step, read them with multi-step reads
+            for first, batch in read_steps(self.fr, self.var, self.step_start + first_row, row_count, start, count, [col_count], self.block):
+                data[first - self.step_start - first_row:][:len(batch)] = batch
+        else:
+            # Rows of one step are consecutive along the second to last dimension, read each run as one box
+            row = first_row
+            while row < first_row + row_count:
+                step, index = self.row_index(row)
+                run = min(first_row + row_count - row, int(self.sel_count[-2]) - index[-1])
+                start[:-1] = self.sel_start[:-1] + index
+                count[:-1] = 1
+                count[-2] = run
+                data[row - first_row:row - first_row + run] = read_step(self.fr, self.var, step, start, count, [run, col_count], self.block)
+                row += run
+
+        self.cache.put((page_row, page_col), (data,))
+        return data
+
+
+# New position after a scrollbar command, ("moveto", fraction) or ("scroll", number, "units" or "pages")
+def scrolled(position, total, visible, *args):
+    if args[0] == "moveto":
+        position = int(float(args[1]) * total)
+    elif args[0] == "scroll":
+        position += int(args[1]) * (visible if args[2] == "pages" else 1)
+    return min(max(position, 0), max(total - visible, 0))
+
+
+# Variables of a file shared by the variable lists. The metadata is read once and the row of a variable
+# is only formatted when it is shown.
+class VariableCatalog:
+    def __init__(self, variables):
+        self.update(variables)
+
+    # Replace the variables, e.g. after new steps of a followed file arrived
+    def update(self, variables):
+        self.variables = variables
+        self.names = list(self.variables.keys())
+        self.lower_names = None
+        self.rows = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def row(self, index):
+        row = self.rows.get(index)
+        if row is None:
+            name = self.names[index]
+            info = self.variables[name]
+            row = str(name)
+            row += ",   " + str(info['Type'])
+            row += ",   " + str(info['AvailableStepsCount'])
+            row += ",   {" + str(info['Shape']) + "}"
+            row += ",   " + str(info['Min'])
+            row += ",   " + str(info['Max'])
+            self.rows[index] = row
+        return row
+
+    # Indices of the variables whose name contains the text, searched within the indices of a shorter text
+    # that the text extends when given
+    def filter(self, text, within=None):
+        if not text:
+            return range(len(self.names))
+        if self.lower_names is None:
+            self.lower_names = [name.lower() for name in self.names]
+        text = text.lower()
+        if within is None:
+            within = range(len(self.names))
+        return [i for i in within if text in self.lower_names[i]]
+
+
+# List of the variables of a catalog with a name filter. Only the visible rows are in the listbox, they are
+# replaced when the list is scrolled or filtered.
+class VariableList(ttk.Frame):
+    def __init__(self, master, catalog, on_select, width=50, height=10):
+        super().__init__(master)
+        self.catalog = catalog
+        self.on_select = on_select
+        self.height = height
+        self.matches = catalog.filter("")
+        self.filter_text = ""
+        self.top = 0
+        self.selected = None
+
+        self.filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(self, textvariable=self.filter_var)
+        filter_entry.pack(side=tk.TOP, fill=tk.X)
+        self.filter_var.trace_add("write", lambda *args: self.filter())
+
+        self.listbox = tk.Listbox(self, width=width, height=height, exportselection=False)
+        self.listbox.pack(side=tk.LEFT, anchor=tk.NW)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.listbox.bind("<<ListboxSelect>>", self.selected_row)
+        self.listbox.bind("<MouseWheel>", lambda event: self.scroll("scroll", -1 if event.delta > 0 else 1, "units") or "break")
+        self.listbox.bind("<Button-4>", lambda event: self.scroll("scroll", -1, "units") or "break")
+        self.listbox.bind("<Button-5>", lambda event: self.scroll("scroll", 1, "units") or "break")
+        self.refresh()
+
+    def refresh(self):
+        visible = self.matches[self.top:self.top + self.height]
+        self.listbox.delete(0, tk.END)
+        for index in visible:
+            self.listbox.insert(tk.END, self.catalog.row(index))
+            if self.catalog.names[index] == self.selected:
+                self.listbox.selection_set(tk.END)
+        if len(self.matches):
+            self.scrollbar.set(self.top / len(self.matches), (self.top + len(visible)) / len(self.matches))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll(self, *args):
+        self.top = scrolled(self.top, len(self.matches), self.height, *args)
+        self.refresh()
+
+    # Typing more of a name narrows the previous matches instead of searching all variables again
+    def filter(self):
+        text = self.filter_var.get()
+        within = self.matches if self.filter_text and text.lower().startswith(self.filter_text.lower()) else None
+        self.matches = self.catalog.filter(text, within)
+        self.filter_text = text
+        self.top = 0
+        self.refresh()
+
+    # Show the variables of the catalog after it was updated, keeping the filter and the selected variable
+    def update_catalog(self):
+        self.matches = self.catalog.filter(self.filter_var.get())
+        self.top = min(self.top, max(len(self.matches) - self.height, 0))
+        self.refresh()
+
+    def selected_row(self, event):
+        row = self.listbox.curselection()
+        if row:
+            self.selected = self.catalog.names[self.matches[self.top + row[0]]]
+            self.on_select(self.selected)
+
+
+# Title of a plot of a selection at one step
+def selection_title(var_name, sel_start, sel_count, step):
+    return "Data from variable " + var_name + " with start " + str(sel_start) + " and count " + str(sel_count) + ", step " + str(step)
+
+
+# Title of a plot of two selections against each other
+def pair_title(var_name, x_var_name, sel_start, x_sel_start, sel_count, x_sel_count, step, x_step):
+    return "Data from variables " + var_name + " and " + x_var_name + " with starts " + str(sel_start) + " and " + str(x_sel_start) + "\n with counts " + str(sel_count) + " and " + str(x_sel_count) + ", steps " + str(step) + " and " + str(x_step)
+
+
+# Title of a probe of a selection over a step range, noting when rows average several steps
+def probe_title(var_name, sel_start, sel_count, step_start, step_count, group):
+    title = "Probe of variable " + var_name + " with start " + str(sel_start) + " and count " + str(sel_count) + ", steps " + str(step_start) + " to " + str(step_start + step_count - 1)
+    if group > 1:
+        title += "\n averaged over " + str(group) + " steps per row"
+    return title
+
+
+# Figure of a 1D plot with an empty line, outside pyplot so that a window embeds it in its own Tk canvas
+# instead of pyplot creating a Tk interpreter for it. Returns the figure, axes, line and title.
+def make_1d_figure(xlabel, ylabel):
+    fig = Figure(figsize=(8, 8))  # Create a new figure for the plot
+    gs = gridspec.GridSpec(1, 1)  # Create a 1x1 grid for the plot layout
+    ax = fig.add_subplot(gs[0, 0])  # Add a subplot to the figure
+
+    line, = ax.plot([], [])
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    title = ax.set_title("")
+    return fig, ax, line, title
+
+
+# Figure of a 2D plot of a selection with an empty image, its colorbar and the border of the selection.
+# Returns the figure, axes, image and title.
+def make_2d_figure(sel_start, sel_count, count_dim):
+    sel_end = sel_start + sel_count
+
+    fig = Figure(figsize=(8, 8))  # Create a new figure for the plot
+    gs = gridspec.GridSpec(1, 1)  # Create a 1x1 grid for the plot layout
+    ax = fig.add_subplot(gs[0, 0])  # Add a subplot to the figure
+
+    colorax = ax.imshow(np.zeros([1, 1]), origin='lower', interpolation='quadric', extent=[
+                sel_start[count_dim[1]], sel_end[count_dim[1]], sel_start[count_dim[0]], sel_end[count_dim[0]]], cmap=plt.get_cmap('gist_ncar'))
+    ax.set_xlabel("axis-" + str(count_dim[0]))
+    ax.set_ylabel("axis-" + str(count_dim[1]))
+
+    fig.colorbar(colorax, orientation='horizontal')
+    ax.plot([sel_start[count_dim[1]], sel_end[count_dim[1]]], [sel_start[count_dim[0]], sel_start[count_dim[0]]],
+            color='black')
+    ax.plot([sel_start[count_dim[1]], sel_end[count_dim[1]]], [sel_end[count_dim[0]], sel_end[count_dim[0]]],
+            color='black')
+    ax.plot([sel_start[count_dim[1]], sel_start[count_dim[1]]], [sel_start[count_dim[0]], sel_end[count_dim[0]]],
+            color='black')
+    ax.plot([sel_end[count_dim[1]], sel_end[count_dim[1]]], [sel_start[count_dim[0]], sel_end[count_dim[0]]],
+            color='black')
+    title = ax.set_title("")
+    return fig, ax, colorax, title
+
+
+# Tk canvas of a figure timing its draws for the stats of its window
+class TracedCanvas(FigureCanvasTkAgg):
+    def __init__(self, fig, master, stats=None):
+        super().__init__(fig, master=master)
+        self.stats = stats
+
+    def draw(self):
+        with tracer.span("draw", "render", self.stats):
+            super().draw()
+
+
+# Canvas of a series window that draws the figure once and afterwards only redraws the artists that
+# change between steps on top of the cached background, unless the axes or color scale changed
+class SeriesCanvas:
+    def __init__(self, fig, master, artists, stats=None):
+        self.fig = fig
+        self.artists = artists
+        self.stats = stats
+        for artist in artists:
+            artist.set_animated(True)
+        self.background = None
+        self.canvas = TracedCanvas(fig, master, stats)
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+
+    # Full draws (first draw, resizing, rescaling) refresh the background
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self.artists:
+            self.fig.draw_artist(artist)
+
+    def update(self, full=False):
+        if full or self.background is None:
+            self.canvas.draw()
+            return
+        with tracer.span("blit", "render", self.stats):
+            self.canvas.restore_region(self.background)
+            for artist in self.artists:
+                self.fig.draw_artist(artist)
+            self.canvas.blit(self.fig.bbox)
+
+
+# Autoscale axes to their current data, except along axes with fixed limits, and tell whether the limits
+# changed
+def autoscale_changed(ax, xlim=None, ylim=None):
+    limits = (ax.get_xlim(), ax.get_ylim())
+    ax.relim()
+    ax.autoscale_view(scalex=xlim is None, scaley=ylim is None)
+    if xlim is not None and tuple(ax.get_xlim()) != tuple(xlim):
+        ax.set_xlim(xlim)
+    if ylim is not None and tuple(ax.get_ylim()) != tuple(ylim):
+        ax.set_ylim(ylim)
+    return limits != (ax.get_xlim(), ax.get_ylim())
+
+
+# Autoscale the color scale of an image to its current data, or set it to fixed limits, and tell whether
+# it changed
+def autoscale_image_changed(image, limits=None):
+    old_limits = image.get_clim()
+    if limits is None:
+        image.autoscale()
+    else:
+        image.set_clim(*limits)
+    return old_limits != image.get_clim()
+
+
+# Scale of series windows: "step" autoscales to each step, "global" fixes the limits over all steps of
+# the series and "rolling" over the steps around the current one
+series_scale = "global"
+
+# Steps on each side of the current step of a rolling scale
+scale_window = 10
+
+
+# Color or y-axis limits of the steps of a series from the minima and maxima of the blocks in the
+# metadata, so that no step has to be read to fix the scale. The block layout may need the metadata of
+# every step of the variable, so it is loaded in the read worker before the first step of the window.
+class SeriesScale:
+    def __init__(self, index, fr, var_name, step_start, step_count, sel_start, sel_count, block=None):
+        self.index = index
+        self.fr = fr
+        self.var_name = var_name
+        self.step_start = step_start
+        self.step_count = step_count
+        self.sel_start = sel_start
+        self.sel_count = sel_count
+        self.block = block
+        self.minmax = None  # minima and maxima of the steps once loaded
+
+    def loaded(self):
+        return self.minmax is not None
+
+    def load(self):
+        if self.minmax is None:
+            layout = self.index.blocks(self.fr, self.var_name)
+            self.minmax = layout.selection_minmax(self.step_start, self.step_count, self.sel_start, self.sel_count, self.block)
+
+    # Limits at a step, or None to autoscale to the data of the step or until the scale is loaded
+    def limits(self, step, mode):
+        if mode == "step" or self.minmax is None:
+            return None
+        mins, maxs = self.minmax
+        if mode == "rolling":
+            i = step - self.step_start
+            steps = slice(max(0, i - scale_window), i + scale_window + 1)
+        else:
+            steps = slice(None)
+        low = np.fmin.reduce(mins[steps])
+        high = np.fmax.reduce(maxs[steps])
+        if not (np.isfinite(low) and np.isfinite(high)):
+            return None
+        if low == high:
+            return low - 0.5, high + 0.5
+        return low, high
+
+
+# Limits covering the limits of several series at a step, or None to autoscale when one has none
+def overlay_limits(scales, step, mode):
+    limits = [scale.limits(step, mode) for scale in scales]
+    if any(l is None for l in limits):
+        return None
+    return min(l[0] for l in limits), max(l[1] for l in limits)
+
+
+# Choice of the scale of a series window, redrawing the current step when it changes
+def scale_chooser(master, redraw):
+    scale_label = tk.Label(master, text="Scale:")
+    scale_label.pack(side=tk.LEFT)
+    chooser = ttk.Combobox(master, values=["step", "global", "rolling"], state="readonly", width=8)
+    chooser.set(series_scale)
+    chooser.bind("<<ComboboxSelected>>", lambda event: redraw())
+    chooser.pack(side=tk.LEFT)
+    return chooser
+
+
+# Background thread reading the steps around the current step of a series window into its cache.
+# Neighbouring missing steps are read together with one batched read.
+class StepPrefetcher:
+    def __init__(self, cache, load_steps, first_step, last_step, depth):
+        self.cache = cache
+        self.load_steps = load_steps  # (first step, step count) -> iterable of (step, tuple of arrays)
+        self.first_step = first_step
+        self.last_step = last_step
+        self.depth = depth
+        self.pending = []
+        self.closed = False
+        self.wake = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # Replace the queued steps with the ones around step, the scroll direction first
+    def update(self, step, direction):
+        ahead = [step + direction * i for i in range(1, self.depth + 1)]
+        behind = [step - direction * i for i in range(1, self.depth + 1)]
+        with self.wake:
+            self.pending = [s for s in ahead + behind if self.first_step <= s <= self.last_step]
+            self.wake.notify()
+
+    def close(self):
+        with self.wake:
+            self.closed = True
+            self.pending = []
+            self.wake.notify()
+
+    def run(self):
+        while True:
+            with self.wake:
+                while not self.pending and not self.closed:
+                    self.wake.wait()
+                if self.closed:
+                    return
+                run = [self.pending.pop(0)]
+                if run[0] in self.cache:
+                    continue
+                # Extend the run with the following queued steps while they are adjacent and missing
+                while self.pending and abs(self.pending[0] - run[-1]) == 1 and self.pending[0] not in self.cache:
+                    if len(run) > 1 and self.pending[0] - run[-1] != run[-1] - run[-2]:
+                        break
+                    run.append(self.pending.pop(0))
+            try:
+                with tracer.attribute(self.cache.stats):
+                    for step, arrays in self.load_steps(min(run), len(run)):
+                        self.cache.put(step, arrays)
+            except Exception as e:
+                print("Prefetch of steps " + str(min(run)) + " to " + str(max(run)) + " failed: " + str(e))
+
+
+# Interval in milliseconds at which the memory use of the process is shown
+memory_poll = 2000
+
+
+# Resident memory of the process in bytes, None where the system does not tell
+def process_memory():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# Windows of a file as Toplevels of its one Tk root, instead of a Tk interpreter per window. Closing a
+# window runs the release callbacks registered for it, last registered first, so that its reads, caches
+# and figures are freed with the window.
+class WindowManager:
+    def __init__(self, root):
+        self.root = root
+        self.windows = {}  # Toplevel -> release callbacks
+
+    def __len__(self):
+        return len(self.windows)
+
+    def open(self, title):
+        window = tk.Toplevel(self.root)
+        window.title(title)
+        self.windows[window] = []
+        window.protocol("WM_DELETE_WINDOW", lambda: self.close(window))
+        return window
+
+    def on_close(self, window, release):
+        self.windows[window].append(release)
+
+    # Drop a figure of the window with it, its artists and the arrays they hold. Figures of windows are
+    # embedded in their canvas without pyplot, so there is no pyplot figure manager to close.
+    def add_figure(self, window, fig):
+        def release():
+            fig.clear()
+
+        self.on_close(window, release)
+
+    def close(self, window):
+        for release in reversed(self.windows.pop(window, [])):
+            try:
+                release()
+            except Exception as e:
+                print("Closing " + window.title() + " failed: " + str(e))
+        window.destroy()
+        gc.collect()
+
+    def close_all(self):
+        for window in list(self.windows):
+            self.close(window)
+
+
+# Status bar with the memory use of the process and the number of open windows
+class MemoryStatus(ttk.Frame):
+    def __init__(self, master, windows):
+        super().__init__(master)
+        self.windows = windows
+        self.label = tk.Label(self)
+        self.label.pack(side=tk.LEFT)
+        self.update_label()
+
+    def update_label(self):
+        memory = process_memory()
+        text = "Memory: " + ("unknown" if memory is None else str(memory // 2**20) + " MB")
+        self.label.config(text=text + ", " + str(len(self.windows)) + " windows open")
+        self.after(memory_poll, self.update_label)
+
+
+# Interval in milliseconds at which finished reads are handed to their windows
+read_poll = 50
+
+# Interval in milliseconds at which the read and draw stats of a window are shown
+trace_poll = 500
+
+
+class ReadRequest:
+    def __init__(self, load, deliver):
+        self.load = load  # () -> result, run by the read worker
+        self.deliver = deliver  # result -> None, run in the Tk loop
+        self.cancelled = False
+
+
+# Thread running the reads requested by the windows of a file one after another, so that the Tk loop never
+# waits for a read. Each window has at most one request: a new request replaces the pending one, and the
+# result of a request that was replaced or cancelled while it ran is dropped. Results are handed to the
+# windows from the Tk loop.
+class ReadWorker:
+    def __init__(self, root):
+        self.root = root
+        self.pending = OrderedDict()  # owner -> request waiting to run, oldest first
+        self.current = {}  # owner -> newest request
+        self.done = []
+        self.wake = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        root.after(read_poll, self.poll)
+
+    def submit(self, owner, load, deliver):
+        request = ReadRequest(load, deliver)
+        with self.wake:
+            self.cancel_locked(owner)
+            self.current[owner] = request
+            self.pending[owner] = request
+            self.wake.notify()
+
+    def cancel(self, owner):
+        with self.wake:
+            self.cancel_locked(owner)
+
+    def cancel_locked(self, owner):
+        request = self.current.pop(owner, None)
+        if request is not None:
+            request.cancelled = True
+        self.pending.pop(owner, None)
+
+    def run(self):
+        while True:
+            with self.wake:
+                while not self.pending:
+                    self.wake.wait()
+                owner, request = self.pending.popitem(last=False)
+            try:
+                result, error = request.load(), None
+            except Exception as e:
+                result, error = None, e
+            with self.wake:
+                if not request.cancelled:
+                    self.done.append((owner, request, result, error))
+
+    def poll(self):
+        with self.wake:
+            done = [d for d in self.done if not d[1].cancelled]
+            self.done = []
+            for owner, request, result, error in done:
+                del self.current[owner]
+        try:
+            for owner, request, result, error in done:
+                # A failing window, e.g. one closed while its read ran, does not stop the results of the others
+                try:
+                    owner.finished(request, result, error)
+                except Exception as e:
+                    print("Could not show a read: " + str(e))
+        finally:
+            self.root.after(read_poll, self.poll)
+
+
+# Status bar of the reads of a window, with what is read, an activity bar and a Cancel button
+class ReadStatus(ttk.Frame):
+    def __init__(self, master, worker):
+        super().__init__(master)
+        self.worker = worker
+        self.label = tk.Label(self)
+        self.label.pack(side=tk.LEFT)
+        self.bar = ttk.Progressbar(self, mode="indeterminate", length=100)
+        self.bar.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = ttk.Button(self, text="Cancel", command=self.cancel, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT)
+        # Time and bytes of the reads and draws of the window
+        self.stats = TraceStats()
+        self.stats_label = tk.Label(self)
+        self.stats_label.pack(side=tk.LEFT, padx=5)
+        self.polling = None
+        self.show_stats()
+
+    def show_stats(self):
+        self.stats_label.config(text=self.stats.text())
+        self.polling = self.after(trace_poll, self.show_stats)
+
+    def destroy(self):
+        self.after_cancel(self.polling)
+        super().destroy()
+
+    # Read in the read worker and deliver the result to the window, replacing the previous read of the window
+    def read(self, text, load, deliver):
+        self.label.config(text=text)
+        self.bar.start()
+        self.cancel_button.config(state=tk.NORMAL)
+
+        def traced_load():
+            with tracer.attribute(self.stats):
+                return load()
+
+        self.worker.submit(self, traced_load, deliver)
+
+    def finished(self, request, result, error):
+        self.idle("")
+        if error is not None:
+            self.label.config(text="Read failed: " + str(error))
+            return
+        with tracer.attribute(self.stats):
+            request.deliver(result)
+
+    def cancel(self):
+        self.worker.cancel(self)
+        self.idle("Cancelled")
+
+    # Forget the current read without a message, e.g. when the data came from the cache instead
+    def drop(self):
+        self.worker.cancel(self)
+        self.idle("")
+
+    def idle(self, text):
+        self.bar.stop()
+        self.cancel_button.config(state=tk.DISABLED)
+        self.label.config(text=text)
+
+
+# Steps of each followed selection kept in memory, fewer if they do not fit in the cache budget
+follow_keep = 16
+
+# Interval in milliseconds at which follow windows look for new steps
+follow_poll = 250
+
+# Seconds a follower waits for the file or stream to be created by the writer
+follow_open_timeout = 3600
+
+# Engine of a followed file when none is given. Without an engine ADIOS2 guesses it from the file, and fails
+# at once instead of waiting when the writer has not created the file yet.
+follow_engine = "BP5"
+
+
+# Newest steps of a selection followed by a window
+class FollowedSelection:
+    def __init__(self, var_name, sel_start, sel_count, data_shape):
+        self.var_name = var_name
+        self.sel_start = sel_start
+        self.sel_count = sel_count
+        self.data_shape = data_shape
+        self.steps = OrderedDict()
+
+    def add(self, step, data):
+        self.steps[step] = data
+        keep = min(follow_keep, max(1, cache_budget // max(data.nbytes, 1)))
+        while len(self.steps) > keep:
+            self.steps.popitem(last=False)
+
+
+# Background thread walking the steps of a file or stream while they are written. Only the selections
+# followed by open windows are read at each step, and only their newest steps are kept.
+class StreamFollower:
+    def __init__(self, bp_file, engine=None):
+        self.bp_file = bp_file
+        self.engine = engine if engine is not None else follow_engine
+        self.variables = {}
+        self.var_steps = {}
+        self.step = -1
+        self.status = "Waiting for the first step of " + bp_file
+        self.selections = {}
+        self.next_key = 0
+        self.lock = threading.Lock()
+        self.closing = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # Follow a selection from the next step on. Returns the key of the selection.
+    def follow(self, var_name, sel_start, sel_count, data_shape):
+        with self.lock:
+            key = self.next_key
+            self.next_key += 1
+            self.selections[key] = FollowedSelection(var_name, sel_start, sel_count, data_shape)
+        return key
+
+    def unfollow(self, key):
+        with self.lock:
+            self.selections.pop(key, None)
+
+    # Steps of a selection in memory, oldest first
+    def steps(self, key):
+        with self.lock:
+            return list(self.selections[key].steps.keys())
+
+    def get(self, key, step):
+        with self.lock:
+            return self.selections[key].steps.get(step)
+
+    def close(self):
+        self.closing.set()
+
+    def run(self):
+        adios = adios2.ADIOS()
+        io = adios.DeclareIO("Follow")
+        io.SetEngine(self.engine)
+        io.SetParameters({"OpenTimeoutSecs": str(follow_open_timeout)})
+        try:
+            fr = io.Open(self.bp_file, adios2.Mode.Read)
+        except Exception as e:
+            self.status = "Could not open " + self.bp_file + ": " + str(e)
+            return
+
+        while not self.closing.is_set():
+            status = fr.BeginStep(adios2.StepMode.Read, follow_poll / 1000)
+            if status == adios2.StepStatus.NotReady:
+                continue
+            if status != adios2.StepStatus.OK:
+                break
+            step = fr.CurrentStep()
+            try:
+                variables = io.AvailableVariables()
+
+                # Read the followed selections of this step together, skipping variables missing from the step
+                with self.lock:
+                    selections = list(self.selections.values())
+                reads = []
+                for selection in selections:
+                    var = io.InquireVariable(selection.var_name)
+                    if not var:
+                        continue
+                    data = np.empty(selection.data_shape, dtype=var_dtype(var))
+                    if len(selection.sel_count):
+                        var.SetSelection([selection.sel_start, selection.sel_count])
+                    fr.Get(var, data, adios2.Mode.Deferred)
+                    reads.append((selection, data))
+                fr.PerformGets()
+            except Exception as e:
+                # Show the failed step and keep following the next ones
+                fr.EndStep()
+                self.status = "Could not read step " + str(step) + ": " + str(e)
+                continue
+            fr.EndStep()
+
+            with self.lock:
+                for name, info in variables.items():
+                    self.var_steps[name] = self.var_steps.get(name, 0) + 1
+                    info = dict(info)
+                    info["AvailableStepsCount"] = str(self.var_steps[name])
+                    self.variables[name] = info
+                for selection, data in reads:
+                    selection.add(step, data)
+                self.step = step
+                self.status = "Step " + str(step)
+
+        fr.Close()
+        if not self.closing.is_set():
+            self.status = "End of stream after step " + str(self.step)
+
+
+# Dimensions of a variable from its metadata, e.g. "64, 48"
+def metadata_shape(info):
+    return [int(i) for i in info["Shape"].split(",")] if info["Shape"] else []
+
+
+# Follow a file or stream while a simulation writes it. The variable list grows with the new steps and
+# plot windows show the newest step of their selection as it arrives.
+def follow_file(bp_file, engine=None):
+    follower = StreamFollower(bp_file, engine)
+
+    root = tk.Tk()
+    root.title("BPView - following " + bp_file)
+    windows = WindowManager(root)
+
+    top_frame = ttk.Frame(root)
+    top_frame.pack(side=tk.TOP, padx=5, pady=5)
+
+    var_frame = ttk.Frame(top_frame)
+    var_frame.pack(side=tk.LEFT, padx=5, pady=5)
+
+    var_label = tk.Label(var_frame, text="Variable, Type, Steps, Dims, Min, Max:")
+    var_label.pack(anchor=tk.NW)
+
+    catalog = VariableCatalog({})
+    selected_var = None
+
+    # Selection entries
+    sel_frame = ttk.Frame(top_frame)
+    sel_frame.pack(side=tk.LEFT, anchor=tk.NW, padx=5, pady=5)
+
+    selected_var_label = tk.Label(sel_frame, text="Variable:")
+    selected_var_label.pack()
+
+    sel_start_label = tk.Label(sel_frame, text="Selection start:")
+    sel_start_label.pack()
+
+    sel_start_entry = ttk.Entry(sel_frame)
+    sel_start_entry.pack()
+
+    sel_count_label = tk.Label(sel_frame, text="Selection count:")
+    sel_count_label.pack()
+
+    sel_count_entry = ttk.Entry(sel_frame)
+    sel_count_entry.pack()
+
+    def update_selected_var(var_name):
+        nonlocal selected_var
+        selected_var = var_name
+        selected_var_label.config(text="Variable: " + selected_var)
+
+        dim = len(metadata_shape(catalog.variables[selected_var]))
+        sel_start_entry.delete(0, tk.END)
+        sel_start_entry.insert(0, str([0] * dim))
+        sel_count_entry.delete(0, tk.END)
+        sel_count_entry.insert(0, str([1] * dim))
+
+    var_list = VariableList(var_frame, catalog, update_selected_var)
+    var_list.pack(side=tk.LEFT, anchor=tk.NW, padx=5, pady=5)
+
+    status_label = tk.Label(root, text=follower.status)
+    status_label.pack(side=tk.TOP)
+
+    # Show the new variables and step counts
+    shown_step = -1
+
+    def poll():
+        nonlocal shown_step
+        status_label.config(text=follower.status)
+        if follower.step != shown_step:
+            with follower.lock:
+                shown_step = follower.step
+                variables = dict(follower.variables)
+            catalog.update(variables)
+            var_list.update_catalog()
+        root.after(follow_poll, poll)
+
+    # Window showing the newest step of a selection, or an older kept step when going back
+    def follow_plot():
+        if selected_var is None:
+            return
+        shape = metadata_shape(catalog.variables[selected_var])
+        dim = len(shape)
+        try:
+            sel_start = np.array(eval(sel_start_entry.get()))
+        except (ValueError, SyntaxError):
+            sel_start = np.zeros(dim, dtype=int)
+        try:
+            sel_count = np.array(eval(sel_count_entry.get()))
+        except (ValueError, SyntaxError):
+            sel_count = np.ones(dim, dtype=int)
+        var_name = selected_var
+        try:
+            check_selection(var_name, sel_start, sel_count, shape)
+        except (ValueError, TypeError) as e:
+            print(e)
+            return
+
+        count_dim = [i for i in range(dim) if sel_count[i] != 1]
+        if len(count_dim) not in (1, 2):
+            print("Selection dimension not 1 or 2")
+            return
+        try:
+            check_read_budget([sel_count[d] for d in count_dim], adios_dtypes.get(catalog.variables[var_name]["Type"], np.float64))
+        except ReadBudgetError as e:
+            print(e)
+            return
+        key = follower.follow(var_name, sel_start, sel_count, [sel_count[d] for d in count_dim])
+
+        window = windows.open("Follow " + var_name)
+
+        plot_frame = ttk.Frame(window)
+        plot_frame.pack(side=tk.TOP, padx=5, pady=5)
+
+        butts_frame = ttk.Frame(window)
+        butts_frame.pack(side=tk.BOTTOM, padx=5, pady=5)
+
+        forw_button = ttk.Button(butts_frame, text="Next")
+        forw_button.pack(side=tk.RIGHT)
+
+        back_button = ttk.Button(butts_frame, text="Previous")
+        back_button.pack(side=tk.LEFT)
+
+        # Live windows jump to every new step, going back stops following until the newest step is reached again
+        live = tk.BooleanVar(master=window, value=True)
+        live_button = ttk.Checkbutton(butts_frame, text="Live", variable=live)
+        live_button.pack(side=tk.LEFT)
+
+        if len(count_dim) == 1:
+            fig, ax, line, title = make_1d_figure("x-axis", "Values")
+            series_canvas = SeriesCanvas(fig, plot_frame, [line, title])
+            decimated_line = DecimatedLine(window, ax, line)
+            x_values = np.arange(sel_start[count_dim[0]], sel_start[count_dim[0]] + sel_count[count_dim[0]])
+        else:
+            fig, ax, colorax, title = make_2d_figure(sel_start, sel_count, count_dim)
+            series_canvas = SeriesCanvas(fig, plot_frame, [colorax, title])
+        NavigationToolbar2Tk(series_canvas.canvas, plot_frame)
+        title.set_text("Waiting for the next step of " + var_name)
+        series_canvas.update(True)
+
+        step = None
+        polling = None
+
+        def show(new_step):
+            nonlocal step
+            data = follower.get(key, new_step)
+            if data is None:
+                return
+            step = new_step
+            if len(count_dim) == 1:
+                decimated_line.set_data(x_values, data)
+                title.set_text(selection_title(var_name, sel_start, sel_count, step))
+                series_canvas.update(autoscale_changed(ax))
+            else:
+                set_lod_image(colorax, data, sel_start, sel_count, count_dim)
+                title.set_text(selection_title(var_name, sel_start, sel_count, step))
+                series_canvas.update(autoscale_image_changed(colorax))
+
+        def update_buttons(steps):
+            back_button.config(state=tk.NORMAL if steps and step is not None and steps[0] < step else tk.DISABLED)
+            forw_button.config(state=tk.NORMAL if steps and step is not None and steps[-1] > step else tk.DISABLED)
+
+        def poll_steps():
+            nonlocal polling
+            steps = follower.steps(key)
+            if live.get() and steps and steps[-1] != step:
+                show(steps[-1])
+            update_buttons(steps)
+            polling = window.after(follow_poll, poll_steps)
+
+        def forw():
+            steps = follower.steps(key)
+            later = [s for s in steps if s > step]
+            if later:
+                show(later[0])
+                live.set(later[0] == steps[-1])
+            update_buttons(steps)
+
+        def back():
+            steps = follower.steps(key)
+            earlier = [s for s in steps if s < step]
+            if earlier:
+                live.set(False)
+                show(earlier[-1])
+            update_buttons(steps)
+
+        forw_button.config(command=forw)
+        back_button.config(command=back)
+
+        def release():
+            window.after_cancel(polling)
+            follower.unfollow(key)
+
+        windows.on_close(window, release)
+        windows.add_figure(window, fig)
+        poll_steps()
+
+    button_frame = ttk.Frame(root)
+    button_frame.pack(side=tk.BOTTOM, anchor=tk.S, padx=5, pady=5)
+
+    plot_button = ttk.Button(button_frame, text="Plot", command=follow_plot)
+    plot_button.pack(side=tk.LEFT, padx=5, pady=5)
+
+    memory_status = MemoryStatus(root, windows)
+    memory_status.pack(side=tk.BOTTOM, anchor=tk.W, padx=5)
+
+    def close():
+        windows.close_all()
+        follower.close()
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", close)
+    poll()
+    root.mainloop()
+    follower.close()
+
+
 # Read BP file and create window and selections.
 def show_file(bp_file):
-    adios = adios2.ADIOS()  # Create ADIOS object
-    io = adios.DeclareIO("SimulationOutput")  # Declare IO object
-
-    # Open the BP file for reading
-    fr = io.Open(bp_file, adios2.Mode.ReadRandomAccess)
+    # Open the BP file for reading, the windows read through its engine
+    reader = BPViewReader(bp_file, name="SimulationOutput")
+    io = reader.io
+    fr = reader.fr
 
     root = tk.Tk()
     root.title("BPView")
 
+    # Plot and display windows are Toplevels of the root, freed when they close
+    windows = WindowManager(root)
+
+    # Reads of all windows run in the read worker
+    read_worker = ReadWorker(root)
+
+    # Strides along the counted dimensions of the next plot when its selection did not fit in the read budget
+    decimation = [1, 1]
+
     # Top frame
     top_frame = ttk.Frame(root)
     top_frame.pack(side=tk.TOP, padx=5, pady=5)
@@ -49,29 +1568,10 @@ def show_file(bp_file):
     var_label = tk.Label(var_frame, text="Variable, Type, Steps, Dims, Min, Max:")
     var_label.pack(anchor=tk.NW)
 
-    variables = io.AvailableVariables()  # Get available variables in BP file
-    var_names = list(variables.keys())  # Extract variable names
-
-    selected_var = var_names[0]  # Set default selected variable to the first one (if available)
-
-    var_listbox = tk.Listbox(var_frame, width=50)
-    var_listbox.pack(side=tk.LEFT, anchor=tk.NW, padx=5, pady=5)
-
-    #Scrollbar
-    scrollbar = tk.Scrollbar(var_frame, orient="vertical", command=var_listbox.yview)
-    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-    var_listbox.config(yscrollcommand=scrollbar.set)
+    index = reader.index  # Get available variables in BP file from its index
+    catalog = VariableCatalog(index.variables)  # Shared by both variable lists
 
-    # List variable info with variable in listbox
-    for var_name in var_names:
-        var = io.InquireVariable(var_name)
-        var_info = str(var_name)
-        var_info += ",   " + str(variables[var_name]['Type'])
-        var_info += ",   " + str(variables[var_name]['AvailableStepsCount'])
-        var_info += ",   {" + str(variables[var_name]['Shape']) + "}"
-        var_info += ",   " + str(variables[var_name]['Min'])
-        var_info += ",   " + str(variables[var_name]['Max'])
-        var_listbox.insert(tk.END, var_info)
+    selected_var = catalog.names[0]  # Set default selected variable to the first one (if available)
 
     # Required selection frame
     first_frame = ttk.Frame(left_frame)
@@ -102,7 +1602,7 @@ def show_file(bp_file):
     sel_start_label.pack()
 
     var = io.InquireVariable(selected_var)
-    shape = var.Shape()
+    shape = var_shape(fr, var, 0 if is_local_array(var) else None)
     dim = len(shape)
     zeros_str = "["
     for d in range(dim):
@@ -130,22 +1630,72 @@ def show_file(bp_file):
     sel_count_entry.insert(0, ones_str)
     sel_count_entry.pack()
 
+    # Writer block, local arrays are selected within one block
+    block_label = tk.Label(first_frame, text="Block (local arrays):")
+    block_label.pack()
+
+    block_entry = ttk.Entry(first_frame)
+    block_entry.insert(0, "0" if is_local_array(var) else "")
+    block_entry.pack()
+
+    # Variables plotted on the same axes as the selected variable in 1D plots
+    overlay_label = tk.Label(first_frame, text="Overlay variables:")
+    overlay_label.pack()
+
+    overlay_entry = ttk.Entry(first_frame)
+    overlay_entry.pack()
+
+    # Names and variables of the overlay variables with the same shape as the selected variable, the others
+    # are skipped
+    def overlay_vars(shape, block):
+        overlays = []
+        for name in overlay_entry.get().split(","):
+            name = name.strip()
+            if not name or name == selected_var:
+                continue
+            overlay = io.InquireVariable(name)
+            if not overlay:
+                print("Overlay variable " + name + " not found")
+                continue
+            try:
+                overlay_shape = var_shape(fr, overlay, block if is_local_array(overlay) else None)
+            except ValueError as e:
+                print(e)
+                continue
+            if list(overlay_shape) != list(shape):
+                print("Overlay variable " + name + " does not have the shape " + str(list(shape)) + " of " + selected_var)
+                continue
+            overlays.append((name, overlay))
+        return overlays
+
+    # Writer block of the selection of a local array, None for other variables
+    def var_block(var, entry):
+        if not is_local_array(var):
+            return None
+        try:
+            return int(entry.get())
+        except ValueError:
+            return 0
+
         # Update selected variable when clicked on
-    def update_selected_var(event):
+    def update_selected_var(var_name):
         nonlocal selected_var
-        selected_var_index = var_listbox.curselection()
-        if selected_var_index:
+        if var_name:
 
-            selected_var = var_listbox.get(var_listbox.curselection()).split(",")[0].strip()  # Update selected variable based on listbox selection
+            selected_var = var_name  # Update selected variable based on list selection
 
             # Update selected variable label
             selected_var_label.config(text="Variable: " + selected_var)
 
             # Update selection start and count default entries based on selected variable
             var = io.InquireVariable(selected_var)
-            shape = var.Shape()
+            block = 0 if is_local_array(var) else None
+            shape = var_shape(fr, var, block)
             dim = len(shape)
 
+            block_entry.delete(0, tk.END)
+            block_entry.insert(0, "" if block is None else str(block))
+
             zeros_str = "["
             for d in range(dim):
                 zeros_str += "0"
@@ -166,7 +1716,8 @@ def show_file(bp_file):
             sel_count_entry.delete(0, tk.END)
             sel_count_entry.insert(0, ones_str)
 
-    var_listbox.bind("<<ListboxSelect>>", update_selected_var)
+    var_list = VariableList(var_frame, catalog, update_selected_var)
+    var_list.pack(side=tk.LEFT, anchor=tk.NW, padx=5, pady=5)
 
     #SPEC stuff, not visible yet
     # Selection 1
@@ -178,28 +1729,8 @@ def show_file(bp_file):
     # Bottom frame
     right_frame = ttk.Frame(top_frame)
 
-    variables = io.AvailableVariables()  # Get available variables in BP file
-    var_names = list(variables.keys())  # Extract variable names
-
     spec_selected_var = selected_var  # Set default second selected variable to first selected variable
 
-    spec_var_listbox = tk.Listbox(var_frame, width=50)
-
-    #Spec scrollbar
-    spec_scrollbar = tk.Scrollbar(var_frame, orient="vertical", command=spec_var_listbox.yview)
-    spec_var_listbox.config(yscrollcommand=spec_scrollbar.set)
-
-    # List variable info with variable in listbox
-    for var_name in var_names:
-        spec_var = io.InquireVariable(var_name)
-        spec_var_info = str(var_name)
-        spec_var_info += ",   " + str(variables[var_name]['Type'])
-        spec_var_info += ",   " + str(variables[var_name]['AvailableStepsCount'])
-        spec_var_info += ",   {" + str(variables[var_name]['Shape']) + "}"
-        spec_var_info += ",   " + str(variables[var_name]['Min'])
-        spec_var_info += ",   " + str(variables[var_name]['Max'])
-        spec_var_listbox.insert(tk.END, spec_var_info)
-
     # Right side labels and entries
     second_frame = ttk.Frame(right_frame)
 
@@ -218,10 +1749,6 @@ def show_file(bp_file):
     # Selection start
     spec_sel_start_label = tk.Label(second_frame, text="Selection start:")
 
-    spec_var = io.InquireVariable(selected_var)
-    spec_shape = spec_var.Shape()
-    spec_dim = len(spec_shape)
-
     spec_sel_start_entry = ttk.Entry(second_frame)
     spec_sel_start_entry.insert(0, str(sel_start_entry.get()))
 
@@ -231,14 +1758,20 @@ def show_file(bp_file):
     spec_sel_count_entry = ttk.Entry(second_frame)
     spec_sel_count_entry.insert(0, str(sel_count_entry.get()))
 
+    # Writer block
+    spec_block_label = tk.Label(second_frame, text="Block (local arrays):")
+
+    spec_block_entry = ttk.Entry(second_frame)
+    spec_block_entry.insert(0, str(block_entry.get()))
+
     global select1
 
     # Selection1 button
     def button1_com():
         global select1
         if select1 == False:
-            spec_var_listbox.pack_forget()
-            var_listbox.pack()
+            spec_var_list.pack_forget()
+            var_list.pack(side=tk.LEFT, anchor=tk.NW, padx=5, pady=5)
         select1 = True
         style.configure('Button1.TButton', font=("TkDefaultFont", 12, "bold"))
         style.configure('Button2.TButton', font=("TkDefaultFont", 12))
@@ -249,8 +1782,8 @@ def show_file(bp_file):
     def button2_com():
         global select1
         if select1:
-            var_listbox.pack_forget()
-            spec_var_listbox.pack()
+            var_list.pack_forget()
+            spec_var_list.pack(side=tk.LEFT, anchor=tk.NW, padx=5, pady=5)
         select1 = False
         style.configure('Button1.TButton', font=("TkDefaultFont", 12))
         style.configure('Button2.TButton', font=("TkDefaultFont", 12, "bold"))
@@ -259,18 +1792,21 @@ def show_file(bp_file):
 
 
     # Update selected variable and automatic entries when clicked on
-    def spec_update_selected_var(event):
+    def spec_update_selected_var(var_name):
         nonlocal spec_selected_var
-        spec_selected_var_index = spec_var_listbox.curselection()
-        if spec_selected_var_index:
-            spec_selected_var =spec_var_listbox.get(spec_var_listbox.curselection()).split(",")[0].strip()  # Update selected variable based on listbox selection
+        if var_name:
+            spec_selected_var = var_name  # Update selected variable based on list selection
 
             spec_selected_var_label.config(text="2nd Variable: " + spec_selected_var)  # Update selected variable label
 
             spec_var = io.InquireVariable(spec_selected_var)
-            spec_shape = spec_var.Shape()
+            spec_block = 0 if is_local_array(spec_var) else None
+            spec_shape = var_shape(fr, spec_var, spec_block)
             spec_dim = len(spec_shape)
 
+            spec_block_entry.delete(0, tk.END)
+            spec_block_entry.insert(0, "" if spec_block is None else str(spec_block))
+
             spec_zeros_str = "["
             for sd in range(spec_dim):
                 spec_zeros_str += "0"
@@ -291,19 +1827,53 @@ def show_file(bp_file):
             spec_sel_count_entry.delete(0, tk.END)
             spec_sel_count_entry.insert(0, spec_ones_str)
 
-    spec_var_listbox.bind("<<ListboxSelect>>", spec_update_selected_var)
+    spec_var_list = VariableList(var_frame, catalog, spec_update_selected_var)
+
+
+    # Export the steps of a series window as PNG frames, a video or a GIF. The frames are rendered by a pool
+    # of processes while a background thread waits for them, so that the window stays responsive.
+    def export_series(window, status_label, var_name, step_start, step_count, sel_start, sel_count,
+                      x_var_name=None, x_step_start=None, x_sel_start=None, x_sel_count=None, block=None, x_block=None,
+                      scale="global"):
+        output = filedialog.asksaveasfilename(parent=window, title="Export to a directory of PNG frames, a video or a GIF",
+                                              filetypes=[("PNG frames directory", "*"), ("MP4 video", "*.mp4"), ("GIF", "*.gif")])
+        if not output:
+            return
+        result = []
+
+        def export():
+            try:
+                frame_count = render_series(bp_file, var_name, step_start, step_count, sel_start, sel_count, output, 10,
+                                            x_var_name, x_step_start, x_sel_start, x_sel_count,
+                                            render_workers if render_workers > 1 else None, block, x_block, scale)
+                result.append("Exported " + str(frame_count) + " frames to " + output)
+            except Exception as e:
+                result.append("Export failed: " + str(e))
+
+        def check():
+            if not window.winfo_exists():
+                return
+            if result:
+                status_label.config(text=result[0])
+            else:
+                window.after(200, check)
 
+        status_label.config(text="Exporting " + str(step_count) + " steps...")
+        threading.Thread(target=export, daemon=True).start()
+        window.after(200, check)
 
         # 2 1D plots
     def plot_1d_v_1d():
         nonlocal fr
 
         var = io.InquireVariable(selected_var)
-        shape = var.Shape()
+        block = var_block(var, block_entry)
+        shape = var_shape(fr, var, block)
         dim = len(shape)
 
         spec_var = io.InquireVariable(spec_selected_var)
-        spec_shape = spec_var.Shape()
+        spec_block = var_block(spec_var, spec_block_entry)
+        spec_shape = var_shape(fr, spec_var, spec_block)
         spec_dim = len(spec_shape)
 
         #First Selection
@@ -351,17 +1921,14 @@ def show_file(bp_file):
         except (ValueError, SyntaxError):
             spec_sel_count = np.ones(spec_dim, dtype=int)
         
+        strides = decimation[:1]
+
         if step_count == 1:
-            window = tk.Tk()
-            window.title("1D v 1D Plot")
+            window = windows.open("1D v 1D Plot")
 
             plot_frame = ttk.Frame(window)
             plot_frame.pack(side=tk.TOP, padx=5, pady=5)
 
-            fig = plt.figure(figsize=(8, 8))  # Create a new figure for the plot
-            gs = gridspec.GridSpec(1, 1)  # Create a 1x1 grid for the plot layout
-            ax = fig.add_subplot(gs[0, 0])  # Add a subplot to the figure
-
             # Check how dimensions are counted
             count_dim = [0]
 
@@ -380,26 +1947,44 @@ def show_file(bp_file):
                     spec_count_dim[spec_j] = spec_i
                     spec_j += 1
             
-            # Plot the values against each other
-            y_values = np.empty([sel_count[count_dim[0]]], dtype=np.float64)
-            var.SetSelection([sel_start, sel_count])
-            fr.Get(var, y_values, adios2.Mode.Sync)
-
-            x_values = np.empty([spec_sel_count[spec_count_dim[0]]], dtype=np.float64)
-            spec_var.SetSelection([spec_sel_start, spec_sel_count])
-            fr.Get(spec_var, x_values, adios2.Mode.Sync)
-
-            ax.plot(x_values, y_values)
-            ax.set_xlabel(str(spec_count_dim[0])+"-axis")
-            ax.set_ylabel(str(count_dim[0])+"-axis")
+            read_status = ReadStatus(window, read_worker)
+            read_status.pack(side=tk.BOTTOM, padx=5, pady=5)
 
-            ax.set_title(
-                "Data from variables " + selected_var + " and " + spec_selected_var + " with starts " + str(sel_start) + " and " + str(spec_sel_start) + "\n with counts " + str(sel_count) + " and " + str(spec_sel_count) + ", steps " + str(step_start) + " and " + str(spec_step_start))
+            # Plot a min/max decimation of the values to the width of the canvas
+            fig, ax, line, title = make_1d_figure(str(spec_count_dim[0])+"-axis", str(count_dim[0])+"-axis")
+            decimated_line = DecimatedLine(window, ax, line)
 
-            canvas = FigureCanvasTkAgg(fig, master=plot_frame)
+            canvas = TracedCanvas(fig, plot_frame, read_status.stats)
             canvas.draw()
+            NavigationToolbar2Tk(canvas, plot_frame)
             canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
 
+            def release():
+                read_status.drop()
+
+            windows.on_close(window, release)
+            windows.add_figure(window, fig)
+
+            # Plot the values against each other, both variables are read with one PerformGets
+            def load():
+                if strides == [1]:
+                    return read_view_step(fr, [
+                        ViewSelection(var, step_start, sel_start, sel_count, [sel_count[count_dim[0]]], block),
+                        ViewSelection(spec_var, spec_step_start, spec_sel_start, spec_sel_count, [spec_sel_count[spec_count_dim[0]]], spec_block)])
+                y_values = read_step_decimated(fr, var, step_start, sel_start, sel_count, count_dim, strides, block)
+                x_values = read_step_decimated(fr, spec_var, spec_step_start, spec_sel_start, spec_sel_count, spec_count_dim, strides, spec_block)
+                return y_values, x_values
+
+            def draw(values):
+                y_values, x_values = values
+                decimated_line.set_data(x_values, y_values)
+                ax.relim()
+                ax.autoscale_view()
+                title.set_text(pair_title(selected_var, spec_selected_var, sel_start, spec_sel_start, sel_count, spec_sel_count, step_start, spec_step_start))
+                canvas.draw_idle()
+
+            read_status.read("Reading step " + str(step_start), load, draw)
+
         else:
             # Check how dimensions are counted
             count_dim = [0]
@@ -419,8 +2004,7 @@ def show_file(bp_file):
                     spec_count_dim[spec_j] = spec_i
                     spec_j += 1
 
-            window = tk.Tk()
-            window.title("1D Plot")
+            window = windows.open("1D Plot")
 
             plot_frame = ttk.Frame(window)
             plot_frame.pack(side=tk.TOP, padx=5, pady=5)
@@ -434,46 +2018,94 @@ def show_file(bp_file):
             back_button = ttk.Button(butts_frame, text="Previous")
             back_button.pack(side=tk.LEFT)
 
+            export_status = tk.Label(window)
+            export_status.pack(side=tk.BOTTOM)
+            export_button = ttk.Button(butts_frame, text="Export", command=lambda: export_series(
+                window, export_status, selected_var, step_start, step_count, sel_start, sel_count,
+                spec_selected_var, spec_step_start, spec_sel_start, spec_sel_count, block, spec_block, scale_mode.get()))
+            export_button.pack(side=tk.LEFT)
+
+            read_status = ReadStatus(window, read_worker)
+            read_status.pack(side=tk.BOTTOM, padx=5, pady=5)
+
+            # Axis limits from the metadata of both variables
+            y_scale = SeriesScale(index, fr, selected_var, step_start, step_count, sel_start, sel_count, block)
+            x_scale = SeriesScale(index, fr, spec_selected_var, spec_step_start, step_count, spec_sel_start, spec_sel_count, spec_block)
+            scale_mode = scale_chooser(butts_frame, lambda: plspec(1))
+
             global step_1
             step_1 = step_start
             global step_2
             step_2 = spec_step_start
 
-            # Plot function
-            def plspec():
-                # Destroy previous plot if exists
-                if len(plot_frame.winfo_children()) > 0:
-                    for widget in plot_frame.winfo_children():
-                        widget.destroy()
+            # Step cache keyed by the offset from step_start, filled ahead of the user by the prefetcher
+            cache = StepCache(cache_budget, read_status.stats)
 
-                global step_1
-                var.SetStepSelection([step_1,1])
+            # Both variables of a step are read with one PerformGets
+            selections = [ViewSelection(var, step_start, sel_start, sel_count, [sel_count[count_dim[0]]], block),
+                          ViewSelection(spec_var, spec_step_start, spec_sel_start, spec_sel_count, [spec_sel_count[spec_count_dim[0]]], spec_block)]
 
-                global step_2
-                spec_var.SetStepSelection([step_2,1])
-                
-                fig = plt.figure(figsize=(8, 8))  # Create a new figure for the plot
-                gs = gridspec.GridSpec(1, 1)  # Create a 1x1 grid for the plot layout
-                ax = fig.add_subplot(gs[0, 0])  # Add a subplot to the figure
-
-                # Plot the values against each other
-                y_values = np.empty([sel_count[count_dim[0]]], dtype=np.float64)
-                var.SetSelection([sel_start, sel_count])
-                fr.Get(var, y_values, adios2.Mode.Sync)
-
-                x_values = np.empty([spec_sel_count[spec_count_dim[0]]], dtype=np.float64)
-                spec_var.SetSelection([spec_sel_start, spec_sel_count])
-                fr.Get(spec_var, x_values, adios2.Mode.Sync)
-
-                ax.plot(x_values, y_values)
-                ax.set_xlabel(str(spec_count_dim[0])+"-axis")
-                ax.set_ylabel(str(count_dim[0])+"-axis")
-
-                ax.set_title(
-                    "Data from variables " + selected_var + " and " + spec_selected_var + " with starts " + str(sel_start) + " and " + str(spec_sel_start) + "\n with counts " + str(sel_count) + " and " + str(spec_sel_count) + ", steps " + str(step_1) + " and " + str(step_2))
-                canvas = FigureCanvasTkAgg(fig, master=plot_frame)
-                canvas.draw()
-                canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+            def load(offset):
+                if strides == [1]:
+                    return read_view_step(fr, selections, offset)
+                y_values = read_step_decimated(fr, var, step_start + offset, sel_start, sel_count, count_dim, strides, block)
+                x_values = read_step_decimated(fr, spec_var, spec_step_start + offset, spec_sel_start, spec_sel_count, spec_count_dim, strides, spec_block)
+                return (y_values, x_values)
+
+            def load_steps(first, count):
+                if strides != [1]:
+                    for offset in range(first, first + count):
+                        yield offset, load(offset)
+                    return
+                for offset, values in iter_view_steps(fr, selections, first, count):
+                    yield offset, values
+
+            prefetcher = StepPrefetcher(cache, load_steps, 0, step_count - 1, prefetch_depth)
+
+            # The figure is created once, each step only updates the line and the title
+            fig, ax, line, title = make_1d_figure(str(spec_count_dim[0])+"-axis", str(count_dim[0])+"-axis")
+
+            series_canvas = SeriesCanvas(fig, plot_frame, [line, title], read_status.stats)
+            NavigationToolbar2Tk(series_canvas.canvas, plot_frame)
+            decimated_line = DecimatedLine(window, ax, line)
+
+            def release():
+                read_status.drop()
+                prefetcher.close()
+                cache.clear()
+
+            windows.on_close(window, release)
+            windows.add_figure(window, fig)
+
+            def draw(offset, values):
+                y_values, x_values = values
+                decimated_line.set_data(x_values, y_values)
+                title.set_text(pair_title(selected_var, spec_selected_var, sel_start, spec_sel_start, sel_count, spec_sel_count, step_start + offset, spec_step_start + offset))
+                series_canvas.update(autoscale_changed(ax, x_scale.limits(spec_step_start + offset, scale_mode.get()),
+                                                       y_scale.limits(step_start + offset, scale_mode.get())))
+
+            # Plot function
+            def plspec(direction=1):
+                # Plot the values against each other, reading the step in the read worker only if not prefetched
+                # and the scales are loaded
+                offset = step_1 - step_start
+                prefetcher.update(offset, direction)
+                values = cache.get(offset) if y_scale.loaded() and x_scale.loaded() else None
+                if values is not None:
+                    read_status.drop()
+                    draw(offset, values)
+                    return
+
+                def read():
+                    y_scale.load()
+                    x_scale.load()
+                    values = cache.get(offset)
+                    if values is None:
+                        values = load(offset)
+                        cache.put(offset, values)
+                    return values
+
+                read_status.read("Reading step " + str(step_start + offset), read, lambda values: draw(offset, values))
 
             # Go forward one step
             def forw():
@@ -481,7 +2113,7 @@ def show_file(bp_file):
                 step_1 += 1
                 global step_2
                 step_2 += 1
-                plspec()
+                plspec(1)
                 
                 if step_1 == step_start + step_count - 1:
                     forw_button.config(state=tk.DISABLED)
@@ -494,7 +2126,7 @@ def show_file(bp_file):
                 step_1 -= 1
                 global step_2
                 step_2 -= 1
-                plspec()
+                plspec(-1)
 
                 if step_1 == step_start:
                     back_button.config(state=tk.DISABLED)
@@ -540,6 +2172,9 @@ def show_file(bp_file):
         spec_sel_count_entry.delete(0, tk.END)
         spec_sel_count_entry.insert(0, str(sel_count_entry.get()))
 
+        spec_block_entry.delete(0, tk.END)
+        spec_block_entry.insert(0, str(block_entry.get()))
+
         button1.pack(side=tk.LEFT)
         button1.config(style='Button1.TButton')
         
@@ -548,13 +2183,9 @@ def show_file(bp_file):
         
         right_frame.pack(side=tk.RIGHT)
 
-        var_listbox.pack_forget()
+        var_list.pack_forget()
 
-        spec_var_listbox.pack(side=tk.LEFT, anchor=tk.NW, padx=5, pady=5)
-
-        scrollbar.pack_forget()
-
-        spec_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        spec_var_list.pack(side=tk.LEFT, anchor=tk.NW, padx=5, pady=5)
 
         second_frame.pack(side=tk.TOP, padx=5, pady=5)
 
@@ -574,6 +2205,10 @@ def show_file(bp_file):
 
         spec_sel_count_entry.pack() 
 
+        spec_block_label.pack()
+
+        spec_block_entry.pack()
+
         hide_button.pack(side=tk.BOTTOM)  
 
         spec_button.config(state=tk.DISABLED)
@@ -589,13 +2224,9 @@ def show_file(bp_file):
         
         right_frame.pack_forget()
 
-        spec_var_listbox.pack_forget()
-
-        var_listbox.pack(side=tk.LEFT, anchor=tk.NW, padx=5, pady=5)
-
-        spec_scrollbar.pack_forget()
+        spec_var_list.pack_forget()
 
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        var_list.pack(side=tk.LEFT, anchor=tk.NW, padx=5, pady=5)
 
         second_frame.pack_forget()
 
@@ -613,7 +2244,11 @@ def show_file(bp_file):
 
         spec_sel_count_label.pack_forget()
 
-        spec_sel_count_entry.pack_forget()  
+        spec_sel_count_entry.pack_forget()
+
+        spec_block_label.pack_forget()
+
+        spec_block_entry.pack_forget()  
 
         hide_button.pack_forget() 
 
@@ -627,7 +2262,8 @@ def show_file(bp_file):
         nonlocal fr
         
         var = io.InquireVariable(selected_var)
-        shape = var.Shape()
+        block = var_block(var, block_entry)
+        shape = var_shape(fr, var, block)
         dim = len(shape)
         
         #Step Selection
@@ -657,16 +2293,11 @@ def show_file(bp_file):
        
         sel_end = sel_start + sel_count
         
-        window = tk.Tk()
-        window.title("2D Plot")
+        window = windows.open("2D Plot")
 
         plot_frame = ttk.Frame(window)
         plot_frame.pack(side=tk.TOP, padx=5, pady=5)
 
-        fig = plt.figure(figsize=(8, 8))  # Create a new figure for the plot
-        gs = gridspec.GridSpec(1, 1)  # Create a 1x1 grid for the plot layout
-        ax = fig.add_subplot(gs[0, 0])  # Add a subplot to the figure
-
         # Check how dimensions are counted
         count_dim = [0,0]
         triv_dim = [0]*(dim-2)
@@ -680,40 +2311,58 @@ def show_file(bp_file):
             else:
                 triv_dim[k] = i
                 k+=1
+
+        read_status = ReadStatus(window, read_worker)
+        read_status.pack(side=tk.BOTTOM, padx=5, pady=5)
+
+        fig, ax, colorax, title = make_2d_figure(sel_start, sel_count, count_dim)
+        title.set_text(selection_title(selected_var, sel_start, sel_count, step_start))
         
-        data = np.empty([sel_count[count_dim[0]], sel_count[count_dim[1]]], dtype=np.float64)
-
-        var.SetSelection([sel_start, sel_count])
-
-        fr.Get(var, data, adios2.Mode.Sync)
-        colorax = ax.imshow(data, origin='lower', interpolation='quadric', extent=[
-                    sel_start[count_dim[1]], sel_end[count_dim[1]], sel_start[count_dim[0]], sel_end[count_dim[0]]], cmap=plt.get_cmap('gist_ncar'))
-        ax.set_xlabel("axis-" + str(count_dim[0]))
-        ax.set_ylabel("axis-" + str(count_dim[1]))
-
-        fig.colorbar(colorax, orientation='horizontal')
-        ax.plot([sel_start[count_dim[1]], sel_end[count_dim[1]]], [sel_start[count_dim[0]], sel_start[count_dim[0]]],
-                color='black')
-        ax.plot([sel_start[count_dim[1]], sel_end[count_dim[1]]], [sel_end[count_dim[0]], sel_end[count_dim[0]]],
-                color='black')
-        ax.plot([sel_start[count_dim[1]], sel_start[count_dim[1]]], [sel_start[count_dim[0]], sel_end[count_dim[0]]],
-                color='black')
-        ax.plot([sel_end[count_dim[1]], sel_end[count_dim[1]]], [sel_start[count_dim[0]], sel_end[count_dim[0]]],
-                color='black')
-
-        ax.set_title("Data from variable " + selected_var + " with start " + str(sel_start) + " and count " + str(sel_count) + ", step " + str(step_start))
-        
-        canvas = FigureCanvasTkAgg(fig, master=plot_frame)
+        canvas = TracedCanvas(fig, plot_frame, read_status.stats)
         canvas.draw()
+        NavigationToolbar2Tk(canvas, plot_frame)
         canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
 
+        def release():
+            read_status.drop()
+
+        windows.on_close(window, release)
+        windows.add_figure(window, fig)
+
+        # Read the visible part of the selection at about the resolution of the canvas
+        def read(visible):
+            lod_start, lod_count, lod_strides = visible
+
+            def draw(data):
+                set_lod_image(colorax, data, lod_start, lod_count, count_dim)
+                colorax.autoscale()
+                canvas.draw_idle()
+
+            read_status.read("Reading step " + str(step_start), lambda: read_step_strided(fr, var, step_start, lod_start, lod_count, count_dim, lod_strides, block), draw)
+
+        strides = decimation
+        lod = lod_selection(ax, sel_start, sel_count, count_dim, strides)
+        read(lod)
+
+        # Re-read only the visible part of the selection after zooming or panning
+        def reread():
+            nonlocal lod
+            visible = lod_selection(ax, sel_start, sel_count, count_dim, strides)
+            if all(np.array_equal(a, b) for a, b in zip(visible, lod)):
+                return
+            lod = visible
+            read(lod)
+
+        on_limits_settled(window, ax, reread)
+
     # 2D Series plot
 
     def plot_2d_series():
         nonlocal fr
 
         var = io.InquireVariable(selected_var)
-        shape = var.Shape()
+        block = var_block(var, block_entry)
+        shape = var_shape(fr, var, block)
         dim = len(shape)
         
         #Step Selection
@@ -749,8 +2398,7 @@ def show_file(bp_file):
                 count_dim[j] = i
                 j += 1
 
-        window = tk.Tk()
-        window.title("2D Series Plot")
+        window = windows.open("2D Series Plot")
 
         plot_frame = ttk.Frame(window)
         plot_frame.pack(side=tk.TOP, padx=5, pady=5)
@@ -764,54 +2412,105 @@ def show_file(bp_file):
         back_button = ttk.Button(butts_frame, text="Previous")
         back_button.pack(side=tk.LEFT)
 
-        global step_2d
-        step_2d = step_start
+        export_status = tk.Label(window)
+        export_status.pack(side=tk.BOTTOM)
+        export_button = ttk.Button(butts_frame, text="Export", command=lambda: export_series(
+            window, export_status, selected_var, step_start, step_count, sel_start, sel_count, block=block, scale=scale_mode.get()))
+        export_button.pack(side=tk.LEFT)
 
-        # Plot function
-        def pl2ds():
-            # Destroy previous plot if exists
-            if len(plot_frame.winfo_children()) > 0:
-                for widget in plot_frame.winfo_children():
-                    widget.destroy()
+        read_status = ReadStatus(window, read_worker)
+        read_status.pack(side=tk.BOTTOM, padx=5, pady=5)
 
-            global step_2d
-            var.SetStepSelection([step_2d,1])
+        # Color scale from the metadata
+        scale = SeriesScale(index, fr, selected_var, step_start, step_count, sel_start, sel_count, block)
+        scale_mode = scale_chooser(butts_frame, lambda: pl2ds(1))
 
-            data = np.empty([sel_count[count_dim[0]], sel_count[count_dim[1]]], dtype=np.float64)
+        global step_2d
+        step_2d = step_start
 
-            var.SetSelection([sel_start, sel_count])
+        # The figure is created once, each step only updates the image, its color scale and the title
+        fig, ax, colorax, title = make_2d_figure(sel_start, sel_count, count_dim)
+
+        series_canvas = SeriesCanvas(fig, plot_frame, [colorax, title], read_status.stats)
+        NavigationToolbar2Tk(series_canvas.canvas, plot_frame)
+
+        # Visible part of the selection, read at about the resolution of the canvas
+        strides = decimation
+        lod_start, lod_count, lod_strides = lod_selection(ax, sel_start, sel_count, count_dim, strides)
+
+        def load(step):
+            return (read_step_strided(fr, var, step, lod_start, lod_count, count_dim, lod_strides, block),)
+
+        def load_steps(first, count):
+            if lod_strides != [1, 1]:
+                for step in range(first, first + count):
+                    yield step, load(step)
+                return
+            for i, data in enumerate(iter_steps(fr, var, first, count, lod_start, lod_count, [lod_count[count_dim[0]], lod_count[count_dim[1]]], block)):
+                yield first + i, (data,)
+
+        # Step cache filled ahead of the user by the prefetcher
+        cache = StepCache(cache_budget, read_status.stats)
+        prefetcher = StepPrefetcher(cache, load_steps, step_start, step_start + step_count - 1, prefetch_depth)
+
+        def release():
+            read_status.drop()
+            prefetcher.close()
+            cache.clear()
+
+        windows.on_close(window, release)
+        windows.add_figure(window, fig)
+
+        # Re-read only the visible part of the selection after zooming or panning, the cached steps hold the old part
+        def reread():
+            nonlocal lod_start, lod_count, lod_strides, cache, prefetcher
+            visible = lod_selection(ax, sel_start, sel_count, count_dim, strides)
+            if all(np.array_equal(a, b) for a, b in zip(visible, (lod_start, lod_count, lod_strides))):
+                return
+            lod_start, lod_count, lod_strides = visible
+            prefetcher.close()
+            cache = StepCache(cache_budget, read_status.stats)
+            prefetcher = StepPrefetcher(cache, load_steps, step_start, step_start + step_count - 1, prefetch_depth)
+            pl2ds()
 
-            fig = plt.figure(figsize=(8, 8))  # Create a new figure for the plot
-            gs = gridspec.GridSpec(1, 1)  # Create a 1x1 grid for the plot layout
-            ax = fig.add_subplot(gs[0, 0])  # Add a subplot to the figure
+        on_limits_settled(window, ax, reread)
 
-            fr.Get(var, data, adios2.Mode.Sync)
-            colorax = ax.imshow(data, origin='lower', interpolation='quadric', extent=[
-                        sel_start[count_dim[1]], sel_end[count_dim[1]], sel_start[count_dim[0]], sel_end[count_dim[0]]], cmap=plt.get_cmap('gist_ncar'))
-            ax.set_xlabel("axis-" + str(count_dim[0]))
-            ax.set_ylabel("axis-" + str(count_dim[1]))
+        def draw(step, lod, values):
+            lod_start, lod_count = lod
+            data, = values
+            set_lod_image(colorax, data, lod_start, lod_count, count_dim)
+            title.set_text(selection_title(selected_var, sel_start, sel_count, step))
+            series_canvas.update(autoscale_image_changed(colorax, scale.limits(step, scale_mode.get())))
 
-            fig.colorbar(colorax, orientation='horizontal')
-            ax.plot([sel_start[count_dim[1]], sel_end[count_dim[1]]], [sel_start[count_dim[0]], sel_start[count_dim[0]]],
-                    color='black')
-            ax.plot([sel_start[count_dim[1]], sel_end[count_dim[1]]], [sel_end[count_dim[0]], sel_end[count_dim[0]]],
-                    color='black')
-            ax.plot([sel_start[count_dim[1]], sel_start[count_dim[1]]], [sel_start[count_dim[0]], sel_end[count_dim[0]]],
-                    color='black')
-            ax.plot([sel_end[count_dim[1]], sel_end[count_dim[1]]], [sel_start[count_dim[0]], sel_end[count_dim[0]]],
-                    color='black')
-
-            ax.set_title("Data from variable " + selected_var + " with start " + str(sel_start) + " and count " + str(sel_count) + ", step " + str(step_2d))
-            
-            canvas = FigureCanvasTkAgg(fig, master=plot_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+        # Plot function
+        def pl2ds(direction=1):
+            # Read the step in the read worker only if it was not prefetched and the scale is loaded
+            step = step_2d
+            lod = (lod_start, lod_count)
+            prefetcher.update(step, direction)
+            values = cache.get(step) if scale.loaded() else None
+            if values is not None:
+                read_status.drop()
+                draw(step, lod, values)
+                return
+
+            step_cache = cache
+
+            def read():
+                scale.load()
+                values = step_cache.get(step)
+                if values is None:
+                    values = load(step)
+                    step_cache.put(step, values)
+                return values
+
+            read_status.read("Reading step " + str(step), read, lambda values: draw(step, lod, values))
 
         # Go forward one step
         def forw():
             global step_2d
             step_2d += 1
-            pl2ds()
+            pl2ds(1)
             
             if step_2d == step_start + step_count -1:
                 forw_button.config(state=tk.DISABLED)
@@ -822,7 +2521,7 @@ def show_file(bp_file):
         def back():
             global step_2d
             step_2d -= 1
-            pl2ds()
+            pl2ds(-1)
 
             if step_2d == step_start:
                 back_button.config(state=tk.DISABLED)
@@ -842,7 +2541,8 @@ def show_file(bp_file):
         nonlocal fr
     
         var = io.InquireVariable(selected_var)
-        shape = var.Shape()
+        block = var_block(var, block_entry)
+        shape = var_shape(fr, var, block)
         dim = len(shape)
 
         #Step Selection
@@ -872,15 +2572,10 @@ def show_file(bp_file):
 
         sel_end = sel_start + sel_count
 
-        window = tk.Tk()
-        window.title("1D Plot")
+        window = windows.open("1D Plot")
 
         plot_frame = ttk.Frame(window)
         plot_frame.pack(side=tk.TOP, padx=5, pady=5)
-        
-        fig = plt.figure(figsize=(8, 8))  # Create a new figure for the plot
-        gs = gridspec.GridSpec(1, 1)  # Create a 1x1 grid for the plot layout
-        ax = fig.add_subplot(gs[0, 0])  # Add a subplot to the figure
 
         # Check how dimensions are counted
         count_dim = [0]
@@ -896,21 +2591,52 @@ def show_file(bp_file):
                 triv_dim[k] = i
                 k+=1
 
-        data = np.empty([sel_count[count_dim[0]]], dtype=np.float64)
-        var.SetSelection([sel_start, sel_count])
+        read_status = ReadStatus(window, read_worker)
+        read_status.pack(side=tk.BOTTOM, padx=5, pady=5)
+
+        strides = decimation[:1]
+        x_values = np.arange(sel_start[count_dim[0]], sel_end[count_dim[0]], strides[0])
+
+        # The selected variable and the overlay variables are read together with one PerformGets
+        overlays = overlay_vars(shape, block)
+        names = [selected_var] + [name for name, _ in overlays]
+        selections = [ViewSelection(v, step_start, sel_start, sel_count, [sel_count[count_dim[0]]], block if is_local_array(v) else None)
+                      for v in [var] + [overlay for _, overlay in overlays]]
+
+        # Plot a min/max decimation of the data to the width of the canvas, one line per variable
+        fig, ax, line, title = make_1d_figure("x-axis", "Values")
+        lines = [line] + [ax.plot([], [])[0] for _ in overlays]
+        decimated_lines = [DecimatedLine(window, ax, l) for l in lines]
+        if overlays:
+            for l, name in zip(lines, names):
+                l.set_label(name)
+            ax.legend()
+        title.set_text(selection_title(", ".join(names), sel_start, sel_count, step_start))
+
+        canvas = TracedCanvas(fig, plot_frame, read_status.stats)
+        canvas.draw()
+        NavigationToolbar2Tk(canvas, plot_frame)
+        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+
+        def release():
+            read_status.drop()
 
-        fr.Get(var, data, adios2.Mode.Sync)
-        x_values = np.arange(sel_start[count_dim[0]], sel_end[count_dim[0]])
-        ax.plot(x_values, data)
-        ax.set_xlabel("x-axis")
-        ax.set_ylabel("Values")
+        windows.on_close(window, release)
+        windows.add_figure(window, fig)
 
-        ax.set_title(
-            "Data from variable " + selected_var + " with start " + str(sel_start) + " and count " + str(sel_count) + ", step " + str(step_start))
+        def load():
+            if strides == [1]:
+                return read_view_step(fr, selections)
+            return tuple(read_step_decimated(fr, sel.var, step_start, sel_start, sel_count, count_dim, strides, sel.block) for sel in selections)
 
-        canvas = FigureCanvasTkAgg(fig, master=plot_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+        def draw(values):
+            for decimated_line, data in zip(decimated_lines, values):
+                decimated_line.set_data(x_values, data)
+            ax.relim()
+            ax.autoscale_view()
+            canvas.draw_idle()
+
+        read_status.read("Reading step " + str(step_start), load, draw)
 
     # 1D Series plot
 
@@ -918,7 +2644,8 @@ def show_file(bp_file):
         nonlocal fr
     
         var = io.InquireVariable(selected_var)
-        shape = var.Shape()
+        block = var_block(var, block_entry)
+        shape = var_shape(fr, var, block)
         dim = len(shape)
 
         #Step Selection
@@ -955,8 +2682,7 @@ def show_file(bp_file):
                 count_dim[j] = i
                 j += 1
 
-        window = tk.Tk()
-        window.title("1D Plot")
+        window = windows.open("1D Plot")
 
         plot_frame = ttk.Frame(window)
         plot_frame.pack(side=tk.TOP, padx=5, pady=5)
@@ -970,44 +2696,104 @@ def show_file(bp_file):
         back_button = ttk.Button(butts_frame, text="Previous")
         back_button.pack(side=tk.LEFT)
 
-        global step_1d
-        step_1d = step_start
+        export_status = tk.Label(window)
+        export_status.pack(side=tk.BOTTOM)
+        export_button = ttk.Button(butts_frame, text="Export", command=lambda: export_series(
+            window, export_status, selected_var, step_start, step_count, sel_start, sel_count, block=block, scale=scale_mode.get()))
+        export_button.pack(side=tk.LEFT)
 
-        # Plot function
-        def pl1ds():
-            # Destroy previous plot if exists
-            if len(plot_frame.winfo_children()) > 0:
-                for widget in plot_frame.winfo_children():
-                    widget.destroy()
+        read_status = ReadStatus(window, read_worker)
+        read_status.pack(side=tk.BOTTOM, padx=5, pady=5)
 
-            global step_1d
-            var.SetStepSelection([step_1d,1])
-            
-            fig = plt.figure(figsize=(8, 8))  # Create a new figure for the plot
-            gs = gridspec.GridSpec(1, 1)  # Create a 1x1 grid for the plot layout
-            ax = fig.add_subplot(gs[0, 0])  # Add a subplot to the figure
+        # The selected variable and the overlay variables are read together with one PerformGets per batch
+        # of steps
+        overlays = overlay_vars(shape, block)
+        names = [selected_var] + [name for name, _ in overlays]
+        selections = [ViewSelection(v, step_start, sel_start, sel_count, [sel_count[count_dim[0]]], block if is_local_array(v) else None)
+                      for v in [var] + [overlay for _, overlay in overlays]]
 
-            data = np.empty([sel_count[count_dim[0]]], dtype=np.float64)
-            var.SetSelection([sel_start, sel_count])
+        # Y-axis limits from the metadata of all variables
+        scales = [SeriesScale(index, fr, name, step_start, step_count, sel_start, sel_count, sel.block)
+                  for name, sel in zip(names, selections)]
+        scale_mode = scale_chooser(butts_frame, lambda: pl1ds(1))
 
-            fr.Get(var, data, adios2.Mode.Sync)
-            x_values = np.arange(sel_start[count_dim[0]], sel_end[count_dim[0]])
-            ax.plot(x_values, data)
-            ax.set_xlabel("x-axis")
-            ax.set_ylabel("Values")
+        global step_1d
+        step_1d = step_start
 
-            ax.set_title(
-                "Data from variable " + selected_var + " with start " + str(sel_start) + " and count " + str(sel_count) + ", step " + str(step_1d))
+        # Step cache filled ahead of the user by the prefetcher
+        cache = StepCache(cache_budget, read_status.stats)
+
+        strides = decimation[:1]
+
+        def load(step):
+            if strides == [1]:
+                return read_view_step(fr, selections, step - step_start)
+            return tuple(read_step_decimated(fr, sel.var, step, sel_start, sel_count, count_dim, strides, sel.block) for sel in selections)
+
+        def load_steps(first, count):
+            if strides != [1]:
+                for step in range(first, first + count):
+                    yield step, load(step)
+                return
+            for offset, values in iter_view_steps(fr, selections, first - step_start, count):
+                yield step_start + offset, values
+
+        prefetcher = StepPrefetcher(cache, load_steps, step_start, step_start + step_count - 1, prefetch_depth)
+
+        # The figure is created once, each step only updates the lines and the title
+        fig, ax, line, title = make_1d_figure("x-axis", "Values")
+        lines = [line] + [ax.plot([], [])[0] for _ in overlays]
+        if overlays:
+            for l, name in zip(lines, names):
+                l.set_label(name)
+            ax.legend()
+        x_values = np.arange(sel_start[count_dim[0]], sel_end[count_dim[0]], strides[0])
+
+        series_canvas = SeriesCanvas(fig, plot_frame, lines + [title], read_status.stats)
+        NavigationToolbar2Tk(series_canvas.canvas, plot_frame)
+        decimated_lines = [DecimatedLine(window, ax, l) for l in lines]
+
+        def release():
+            read_status.drop()
+            prefetcher.close()
+            cache.clear()
+
+        windows.on_close(window, release)
+        windows.add_figure(window, fig)
+
+        def draw(step, values):
+            for decimated_line, data in zip(decimated_lines, values):
+                decimated_line.set_data(x_values, data)
+            title.set_text(selection_title(", ".join(names), sel_start, sel_count, step))
+            series_canvas.update(autoscale_changed(ax, None, overlay_limits(scales, step, scale_mode.get())))
 
-            canvas = FigureCanvasTkAgg(fig, master=plot_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+        # Plot function
+        def pl1ds(direction=1):
+            # Read the step in the read worker only if it was not prefetched and the scales are loaded
+            step = step_1d
+            prefetcher.update(step, direction)
+            values = cache.get(step) if all(scale.loaded() for scale in scales) else None
+            if values is not None:
+                read_status.drop()
+                draw(step, values)
+                return
+
+            def read():
+                for scale in scales:
+                    scale.load()
+                values = cache.get(step)
+                if values is None:
+                    values = load(step)
+                    cache.put(step, values)
+                return values
+
+            read_status.read("Reading step " + str(step), read, lambda values: draw(step, values))
 
         # Go forward one step
         def forw():
             global step_1d
             step_1d += 1
-            pl1ds()
+            pl1ds(1)
             
             if step_1d == step_start + step_count - 1:
                 forw_button.config(state=tk.DISABLED)
@@ -1018,7 +2804,7 @@ def show_file(bp_file):
         def back():
             global step_1d
             step_1d -= 1
-            pl1ds()
+            pl1ds(-1)
 
             if step_1d == step_start:
                 back_button.config(state=tk.DISABLED)
@@ -1038,7 +2824,8 @@ def show_file(bp_file):
         nonlocal fr
     
         var = io.InquireVariable(selected_var)
-        shape = var.Shape()
+        block = var_block(var, block_entry)
+        shape = var_shape(fr, var, block)
         dim = len(shape)
 
         # Step Selection
@@ -1066,42 +2853,186 @@ def show_file(bp_file):
             sel_count = np.ones(dim, dtype=int)
             
         # Create a new window for the display
-        display_window = tk.Toplevel(root)
-        display_window.title("Data Display")
+        display_window = windows.open("Data Display")
+
+        header_label = tk.Label(display_window, text="Data from variable " + selected_var + " with start " + str(sel_start) + " and count " + str(sel_count) + ", step " + str(step_start) + " with step count " + str(step_count))
+        header_label.pack(side=tk.TOP, padx=5, pady=5)
 
         text_frame = ttk.Frame(display_window)
         text_frame.pack(side=tk.TOP, padx=5, pady=5)
 
-        # Create a text box for displaying the result
-        text_box = scrolledtext.ScrolledText(text_frame, wrap=tk.WORD, width=80, height=20)
-        text_box.pack(fill=tk.BOTH, expand=True)
+        # Create a text box for displaying the visible rows and columns, scrolling reads the pages they are in
+        visible_rows = 20
+        visible_cols = 8
 
-        
+        text_box = tk.Text(text_frame, wrap=tk.NONE, width=120, height=visible_rows)
+        y_scrollbar = tk.Scrollbar(text_frame, orient="vertical")
+        x_scrollbar = tk.Scrollbar(text_frame, orient="horizontal")
+        text_box.grid(row=0, column=0, sticky=tk.NSEW)
+        y_scrollbar.grid(row=0, column=1, sticky=tk.NS)
+        x_scrollbar.grid(row=1, column=0, sticky=tk.EW)
 
+        paged = PagedSelection(fr, var, step_start, step_count, sel_start, sel_count, block)
+        top_row = 0
+        first_col = 0
 
-        def update_text_box():
-            nonlocal text_box, fr, var, sel_start, sel_count, step_start, step_count
+        read_status = ReadStatus(display_window, read_worker)
+        read_status.pack(side=tk.BOTTOM, padx=5, pady=5)
+        windows.on_close(display_window, read_status.drop)
+        windows.on_close(display_window, paged.cache.clear)
 
-            data_str = "Data from variable " + selected_var + " with start " + str(sel_start) + " and count " + str(sel_count) + ", step " + str(step_start) + " with step count " + str(step_count) + "\n\n"
-            for s in range(step_count):
-                
-                var.SetStepSelection([step_start+s, 1])
-                var.SetSelection([sel_start, sel_count])
+        # Read the pages of the visible rows and columns in the read worker, scrolling on replaces the read
+        def update_text_box():
+            row = top_row
+            col = first_col
+            row_count = min(visible_rows, paged.rows - row)
+            col_count = min(visible_cols, paged.cols - col)
+
+            def show(data):
+                text_box.config(state=tk.NORMAL)
+                text_box.delete("1.0", tk.END)
+                text_box.insert(tk.END, "\n".join(paged.lines(row, col, data)))
+                text_box.config(state=tk.DISABLED)
+
+            y_scrollbar.set(row / paged.rows, (row + row_count) / paged.rows)
+            x_scrollbar.set(col / paged.cols, (col + col_count) / paged.cols)
+            read_status.read("Reading rows " + str(row) + " to " + str(row + row_count - 1), lambda: paged.get(row, row_count, col, col_count), show)
+
+        def scroll_rows(*args):
+            nonlocal top_row
+            top_row = scrolled(top_row, paged.rows, visible_rows, *args)
+            update_text_box()
+
+        def scroll_cols(*args):
+            nonlocal first_col
+            first_col = scrolled(first_col, paged.cols, visible_cols, *args)
+            update_text_box()
+
+        y_scrollbar.config(command=scroll_rows)
+        x_scrollbar.config(command=scroll_cols)
+        text_box.bind("<MouseWheel>", lambda event: scroll_rows("scroll", -1 if event.delta > 0 else 1, "units"))
+        text_box.bind("<Button-4>", lambda event: scroll_rows("scroll", -1, "units"))
+        text_box.bind("<Button-5>", lambda event: scroll_rows("scroll", 1, "units"))
 
-                data = np.empty(sel_count, dtype=np.float64)
-                fr.Get(var, data, adios2.Mode.Sync)
+        update_text_box()
 
-                data_str += np.array2string(data, precision=5, separator=', ') + "\n"
+    # Plan the read of the selection against the read budget. Returns False if it should not be read, and
+    # sets the decimation of the plots or the step count to what the user chose instead. Paged views never
+    # read the whole selection, only the selection itself is checked for them.
+    def plan_selection(var_name, start_entry, count_entry, block_entry, step_count, lod, chunkable, paged=False):
+        nonlocal decimation
+        var = io.InquireVariable(var_name)
+        try:
+            shape = var_shape(fr, var, var_block(var, block_entry))
+        except ValueError as e:
+            print(e)
+            return False
+        dim = len(shape)
+        try:
+            sel_start = np.array(eval(start_entry.get()))
+        except (ValueError, SyntaxError):
+            sel_start = np.zeros(dim, dtype=int)
+        try:
+            sel_count = np.array(eval(count_entry.get()))
+        except (ValueError, SyntaxError):
+            sel_count = np.ones(dim, dtype=int)
 
-            text_box.delete("1.0", tk.END)
-            text_box.insert(tk.END, data_str)
+        try:
+            plan = ReadPlan(var, sel_start, sel_count, step_count, lod, shape)
+        except ValueError as e:
+            print(e)
+            return False
+        if plan.fits or paged or (chunkable and 1 <= plan.chunk_steps):
+            return True
+
+        if ask_read_plan(root, plan) != "decimated":
+            return False
+        decimation = plan.strides
+        return True
+
+    # Writer blocks of the selected variable at the step start, from the file index. The block layout is
+    # read in the read worker, as it may need the metadata of every step. The blocks intersecting the
+    # selection are highlighted, double-clicking a block selects it.
+    def show_blocks():
+        var = io.InquireVariable(selected_var)
+        var_name = selected_var
+        try:
+            step = int(step_start_entry.get())
+        except ValueError:
+            step = 0
+        local = is_local_array(var)
+        block = var_block(var, block_entry) if local else None
+        selection = (sel_start_entry.get(), sel_count_entry.get())
+        blocks_status.read("Reading the blocks of " + var_name, lambda: index.blocks(fr, var_name),
+                           lambda layout: show_layout(layout, var_name, step, local, block, selection))
+
+    def show_layout(layout, var_name, step, local, block, selection):
+        if not 0 <= step < layout.step_count():
+            print("Step " + str(step) + " not found")
+            return
+        first = layout.offsets[step]
+        block_count = layout.offsets[step + 1] - first
+
+        if local:
+            selected = np.arange(block_count) == block
+        else:
+            try:
+                selected = layout.intersecting(step, eval(selection[0]), eval(selection[1]))
+            except (ValueError, SyntaxError, TypeError):
+                selected = np.zeros(block_count, dtype=bool)
+
+        blocks_window = windows.open("Blocks of " + var_name)
+
+        header_label = tk.Label(blocks_window, text=str(block_count) + " blocks of " + var_name + " at step " + str(step) + ", " + str(int(selected.sum())) + " of them selected")
+        header_label.pack(side=tk.TOP, padx=5, pady=5)
+
+        tree_frame = ttk.Frame(blocks_window)
+        tree_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=1, padx=5, pady=5)
+
+        tree = ttk.Treeview(tree_frame, columns=("block", "start", "count", "min", "max"), show="headings", height=20)
+        for column, heading in zip(tree["columns"], ["Block", "Start", "Count", "Min", "Max"]):
+            tree.heading(column, text=heading)
+        tree.tag_configure("selected", background="light blue")
+        tree_scrollbar = tk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
+        tree.config(yscrollcommand=tree_scrollbar.set)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=1)
+        tree_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        for b in range(block_count):
+            i = first + b
+            tree.insert("", tk.END, iid=str(b), tags=("selected",) if selected[b] else (),
+                        values=(b, list(layout.starts[i]), list(layout.counts[i]), layout.mins[i], layout.maxs[i]))
+
+        # Select the whole block, by its number for local arrays and by its box for global arrays
+        def select_block(event):
+            row = tree.focus()
+            if not row:
+                return
+            b = int(row)
+            counts = [int(c) for c in layout.counts[first + b]]
+            if local:
+                block_entry.delete(0, tk.END)
+                block_entry.insert(0, str(b))
+                starts = [0] * len(counts)
+            else:
+                starts = [int(c) for c in layout.starts[first + b]]
+            sel_start_entry.delete(0, tk.END)
+            sel_start_entry.insert(0, str(starts))
+            sel_count_entry.delete(0, tk.END)
+            sel_count_entry.insert(0, str(counts))
 
-        update_text_box()
+        tree.bind("<Double-1>", select_block)
 
     # Check dimensions, steps, and if more options displayed and plot data accordingly
     def check_and_plot():
+        nonlocal decimation
         var = io.InquireVariable(selected_var)
-        shape = var.Shape()
+        block = var_block(var, block_entry)
+        try:
+            shape = var_shape(fr, var, block)
+        except ValueError as e:
+            print(e)
+            return
         dim = len(shape)
 
         # Creates selection count array for checking purposes
@@ -1122,6 +3053,17 @@ def show_file(bp_file):
             if (sel_count[i] != 1):
                 j += 1
         global spec
+
+        # Series windows read one step or a chunk of steps at a time, single plots all at once
+        decimation = [1, 1]
+        if not plan_selection(selected_var, sel_start_entry, sel_count_entry, block_entry, step_count, j == 2 and lod_enabled, step_count != 1):
+            return
+        if spec and not plan_selection(spec_selected_var, spec_sel_start_entry, spec_sel_count_entry, spec_block_entry, step_count, False, step_count != 1):
+            return
+        try:
+            step_count = int(step_count_entry.get())
+        except ValueError:
+            step_count = 1
         
 
         if spec:
@@ -1143,10 +3085,573 @@ def show_file(bp_file):
         else:
             print("Selection dimension not 1 or 2")
 
-    # Displays data if display button clicked
-    def check_and_display():
+    # Probe: a point or a line of the selection over the step range, as value versus step or as a step by
+    # position heatmap. The steps are read in batches in the read worker.
+    def plot_probe():
+        var = io.InquireVariable(selected_var)
+        block = var_block(var, block_entry)
+        shape = var_shape(fr, var, block)
+        dim = len(shape)
+
+        try:
+            step_start = int(step_start_entry.get())
+        except ValueError:
+            step_start = 0
+
+        try:
+            step_count = int(step_count_entry.get())
+        except ValueError:
+            step_count = 1
+
+        try:
+            sel_start = np.array(eval(sel_start_entry.get()))
+        except (ValueError, SyntaxError):
+            sel_start = np.zeros(dim, dtype=int)
+
+        try:
+            sel_count = np.array(eval(sel_count_entry.get()))
+        except (ValueError, SyntaxError):
+            sel_count = np.ones(dim, dtype=int)
+
+        count_dim = [i for i in range(dim) if sel_count[i] != 1]
+        if len(count_dim) > 1:
+            print("Probe selection must be a point or a line")
+            return
+
+        window = windows.open("Probe")
+
+        plot_frame = ttk.Frame(window)
+        plot_frame.pack(side=tk.TOP, padx=5, pady=5)
+
+        read_status = ReadStatus(window, read_worker)
+        read_status.pack(side=tk.BOTTOM, padx=5, pady=5)
+
+        if not count_dim:
+            # Value of the point versus step
+            fig, ax, line, title = make_1d_figure("Step", "Value")
+            decimated_line = DecimatedLine(window, ax, line)
+            rows = None
+            data_shape = []
+        else:
+            # Steps along the y-axis and the positions of the line along the x-axis
+            d = count_dim[0]
+            fig = Figure(figsize=(8, 8))
+            ax = fig.add_subplot(1, 1, 1)
+            colorax = ax.imshow(np.zeros([1, 1]), origin='lower', aspect='auto', interpolation='nearest', extent=[
+                sel_start[d], sel_start[d] + sel_count[d], step_start, step_start + step_count], cmap=plt.get_cmap('gist_ncar'))
+            fig.colorbar(colorax, orientation='horizontal')
+            ax.set_xlabel("axis-" + str(d))
+            ax.set_ylabel("Step")
+            title = ax.set_title("")
+            rows = probe_rows if lod_enabled else None
+            data_shape = [sel_count[d]]
+
+        canvas = TracedCanvas(fig, plot_frame, read_status.stats)
+        canvas.draw()
+        NavigationToolbar2Tk(canvas, plot_frame)
+        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+
+        def release():
+            read_status.drop()
+
+        windows.on_close(window, release)
+        windows.add_figure(window, fig)
+
+        def draw(result):
+            steps, values = result
+            group = steps[1] - steps[0] if len(steps) > 1 else 1
+            if not count_dim:
+                decimated_line.set_data(steps, values)
+                ax.relim()
+                ax.autoscale_view()
+            else:
+                colorax.set_data(plottable(values))
+                colorax.autoscale()
+            title.set_text(probe_title(selected_var, sel_start, sel_count, step_start, step_count, group))
+            canvas.draw_idle()
+
+        read_status.read("Reading steps " + str(step_start) + " to " + str(step_start + step_count - 1),
+                         lambda: read_probe(fr, var, step_start, step_count, sel_start, sel_count, data_shape, rows, block), draw)
+
+    # Histogram or PDF of the selection over the step range, with bins fixed from the metadata. Series go
+    # through the histograms of single steps with "Previous" and "Next", "All steps" shows the whole range.
+    def plot_histogram():
+        var = io.InquireVariable(selected_var)
+        block = var_block(var, block_entry)
+        shape = var_shape(fr, var, block)
+        dim = len(shape)
+
+        try:
+            step_start = int(step_start_entry.get())
+        except ValueError:
+            step_start = 0
+
+        try:
+            step_count = int(step_count_entry.get())
+        except ValueError:
+            step_count = 1
+
+        try:
+            sel_start = np.array(eval(sel_start_entry.get()))
+        except (ValueError, SyntaxError):
+            sel_start = np.zeros(dim, dtype=int)
+
+        try:
+            sel_count = np.array(eval(sel_count_entry.get()))
+        except (ValueError, SyntaxError):
+            sel_count = np.ones(dim, dtype=int)
+
+        window = windows.open("Histogram")
+
+        plot_frame = ttk.Frame(window)
+        plot_frame.pack(side=tk.TOP, padx=5, pady=5)
+
+        butts_frame = ttk.Frame(window)
+        butts_frame.pack(side=tk.BOTTOM, padx=5, pady=5)
+
+        pdf = tk.BooleanVar(window, value=False)
+        pdf_button = ttk.Checkbutton(butts_frame, text="PDF", variable=pdf)
+        pdf_button.pack(side=tk.LEFT)
+
+        read_status = ReadStatus(window, read_worker)
+        read_status.pack(side=tk.BOTTOM, padx=5, pady=5)
+
+        fig = Figure(figsize=(8, 8))
+        ax = fig.add_subplot(1, 1, 1)
+        ax.set_xlabel("Value")
+        title = ax.set_title("")
+        stairs = ax.stairs(np.zeros(histogram_bins), np.arange(histogram_bins + 1))
+
+        canvas = TracedCanvas(fig, plot_frame, read_status.stats)
+        canvas.draw()
+        NavigationToolbar2Tk(canvas, plot_frame)
+        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+
+        # Bins are fixed before the first read, in the read worker as they may need a pass over the data
+        edges = []
+        shown = [None, None]  # step or None for all steps, counts
+
+        def load_all():
+            if not edges:
+                edges.append(histogram_edges(fr, var, index.blocks(fr, var.Name()), step_start, step_count, sel_start, sel_count, block))
+            return read_histogram(fr, var, step_start, step_count, sel_start, sel_count, edges[0], block)
+
+        def draw(step, counts):
+            shown[0] = step
+            shown[1] = counts
+            widths = np.diff(edges[0])
+            if pdf.get():
+                values = counts / (counts.sum() * widths) if counts.sum() else np.zeros(len(counts))
+                ax.set_ylabel("Probability density")
+            else:
+                values = counts
+                ax.set_ylabel("Count")
+            stairs.set_data(values, edges[0])
+            ax.set_xlim(edges[0][0], edges[0][-1])
+            ax.set_ylim(0, max(float(np.max(values)), 1e-300) * 1.05)
+            if step is None:
+                title.set_text(histogram_title(selected_var, sel_start, sel_count, step_start, step_count))
+            else:
+                title.set_text(histogram_title(selected_var, sel_start, sel_count, step, 1))
+            canvas.draw_idle()
+
+        def redraw():
+            if shown[1] is not None:
+                draw(*shown)
+
+        pdf_button.config(command=redraw)
+
+        cache = StepCache(cache_budget, read_status.stats)
+        prefetcher = None
+        if step_count > 1:
+            # Histograms of single steps, read ahead of the user like the steps of a series
+            def load_steps(first, count):
+                counts = read_histogram(fr, var, first, count, sel_start, sel_count, edges[0], block, per_step=True)
+                for i in range(count):
+                    yield first + i, (counts[i],)
+
+            prefetcher = StepPrefetcher(cache, load_steps, step_start, step_start + step_count - 1, prefetch_depth)
+
+            back_button = ttk.Button(butts_frame, text="Previous", state=tk.DISABLED)
+            back_button.pack(side=tk.LEFT)
+            all_button = ttk.Button(butts_frame, text="All steps", state=tk.DISABLED)
+            all_button.pack(side=tk.LEFT)
+            forw_button = ttk.Button(butts_frame, text="Next", state=tk.DISABLED)
+            forw_button.pack(side=tk.RIGHT)
+
+            def show_step(step, direction):
+                back_button.config(state=tk.DISABLED if step == step_start else tk.NORMAL)
+                forw_button.config(state=tk.DISABLED if step == step_start + step_count - 1 else tk.NORMAL)
+                prefetcher.update(step, direction)
+                values = cache.get(step)
+                if values is not None:
+                    read_status.drop()
+                    draw(step, values[0])
+                    return
+
+                def read():
+                    values = next(load_steps(step, 1))[1]
+                    cache.put(step, values)
+                    return values
 
-        display_nd()
+                read_status.read("Reading step " + str(step), read, lambda values: draw(step, values[0]))
+
+            def forw():
+                show_step(step_start if shown[0] is None else shown[0] + 1, 1)
+
+            def back():
+                show_step(step_start + step_count - 1 if shown[0] is None else shown[0] - 1, -1)
+
+            def show_all():
+                if all_counts:
+                    read_status.drop()
+                    forw_button.config(state=tk.NORMAL)
+                    back_button.config(state=tk.NORMAL)
+                    draw(None, all_counts[0])
+
+            forw_button.config(command=forw)
+            back_button.config(command=back)
+            all_button.config(command=show_all)
+
+        all_counts = []
+
+        def draw_all(counts):
+            all_counts.append(counts)
+            if step_count > 1:
+                forw_button.config(state=tk.NORMAL)
+                back_button.config(state=tk.NORMAL)
+                all_button.config(state=tk.NORMAL)
+            draw(None, counts)
+
+        def release():
+            read_status.drop()
+            if prefetcher is not None:
+                prefetcher.close()
+            cache.clear()
+
+        windows.on_close(window, release)
+        windows.add_figure(window, fig)
+
+        read_status.read("Reading steps " + str(step_start) + " to " + str(step_start + step_count - 1), load_all, draw_all)
+
+    # Draws a histogram if histogram button clicked, the histogram reads one chunk at a time
+    def check_and_histogram():
+        try:
+            step_count = int(step_count_entry.get())
+        except ValueError:
+            step_count = 1
+        if plan_selection(selected_var, sel_start_entry, sel_count_entry, block_entry, step_count, False, True, paged=True):
+            plot_histogram()
+
+    # The slice browser reads one plane of the step start at a time, its selection is checked like the plots
+    def check_and_slices():
+        nonlocal decimation
+        decimation = [1, 1]
+        if plan_selection(selected_var, sel_start_entry, sel_count_entry, block_entry, 1, lod_enabled, False):
+            plot_slices()
+
+    # Slice browser: planes of a variable with 3 or more dimensions along a plane axis, chosen with a slider.
+    # The planes span the 2 counted dimensions of the selection, or the last 2 dimensions of the variable.
+    # Only the plane shown is read, at about the resolution of the canvas, and the planes next to it are
+    # read ahead into a small cache so that scrubbing through depth stays interactive.
+    def plot_slices():
+        var = io.InquireVariable(selected_var)
+        block = var_block(var, block_entry)
+        shape = var_shape(fr, var, block)
+        dim = len(shape)
+        if dim < 3:
+            print("Slices need a variable with at least 3 dimensions")
+            return
+
+        try:
+            step_start = int(step_start_entry.get())
+        except ValueError:
+            step_start = 0
+
+        try:
+            sel_start = np.array(eval(sel_start_entry.get()))
+        except (ValueError, SyntaxError):
+            sel_start = np.zeros(dim, dtype=int)
+
+        try:
+            sel_count = np.array(eval(sel_count_entry.get()))
+        except (ValueError, SyntaxError):
+            sel_count = np.ones(dim, dtype=int)
+
+        # Every n-th value of the planes of the selection when it did not fit in the read budget
+        strides = decimation
+        count_dim = [i for i in range(dim) if sel_count[i] != 1]
+        if len(count_dim) != 2:
+            count_dim = [dim - 2, dim - 1]
+            sel_start = np.zeros(dim, dtype=int)
+            sel_count = np.ones(dim, dtype=int)
+            for d in count_dim:
+                sel_count[d] = shape[d]
+            strides = [1, 1]
+        plane_axes = [d for d in range(dim) if d not in count_dim and shape[d] > 1]
+        if not plane_axes:
+            plane_axes = [d for d in range(dim) if d not in count_dim]
+
+        window = windows.open("Slices")
+
+        plot_frame = ttk.Frame(window)
+        plot_frame.pack(side=tk.TOP, padx=5, pady=5)
+
+        butts_frame = ttk.Frame(window)
+        butts_frame.pack(side=tk.BOTTOM, padx=5, pady=5)
+
+        axis_label = tk.Label(butts_frame, text="Plane axis:")
+        axis_label.pack(side=tk.LEFT)
+        axis_chooser = ttk.Combobox(butts_frame, values=plane_axes, state="readonly", width=4)
+        axis_chooser.set(plane_axes[0])
+        axis_chooser.pack(side=tk.LEFT)
+
+        slider = tk.Scale(butts_frame, orient=tk.HORIZONTAL, length=400)
+        slider.pack(side=tk.LEFT, padx=5)
+
+        fixed_scale = tk.BooleanVar(window, value=True)
+        fixed_button = ttk.Checkbutton(butts_frame, text="Fixed scale", variable=fixed_scale)
+        fixed_button.pack(side=tk.LEFT)
+
+        read_status = ReadStatus(window, read_worker)
+        read_status.pack(side=tk.BOTTOM, padx=5, pady=5)
+
+        # The figure is created once, each plane only updates the image, its color scale and the title
+        fig, ax, colorax, title = make_2d_figure(sel_start, sel_count, count_dim)
+
+        series_canvas = SeriesCanvas(fig, plot_frame, [colorax, title], read_status.stats)
+        NavigationToolbar2Tk(series_canvas.canvas, plot_frame)
+
+        # Visible part of the planes, read at about the resolution of the canvas
+        lod_start, lod_count, lod_strides = lod_selection(ax, sel_start, sel_count, count_dim, strides)
+        axis = plane_axes[0]
+        plane = int(sel_start[axis])
+
+        def load_planes(first, count):
+            planes = read_planes(fr, var, step_start, lod_start, lod_count, count_dim, lod_strides, axis, first, count, block)
+            for i in range(count):
+                yield first + i, (planes[i],)
+
+        # Small cache of the planes around the current one, filled ahead of the slider by the prefetcher
+        def plane_cache():
+            plane_bytes = len(range(0, lod_count[count_dim[0]], lod_strides[0])) * len(range(0, lod_count[count_dim[1]], lod_strides[1])) * var_dtype(var).itemsize
+            return StepCache(min(cache_budget, slice_cache_planes * plane_bytes), read_status.stats)
+
+        cache = plane_cache()
+        prefetcher = StepPrefetcher(cache, load_planes, 0, shape[axis] - 1, prefetch_depth)
+
+        # Color limits of all planes along an axis from the metadata, None when unknown. The block layout may
+        # need the metadata of every step, so the limits of an axis are found in the read worker before its
+        # first plane is read.
+        def axis_limits(plane_axis):
+            stack_start = np.array(sel_start)
+            stack_count = np.array(sel_count)
+            stack_start[plane_axis] = 0
+            stack_count[plane_axis] = shape[plane_axis]
+            mins, maxs = index.blocks(fr, var.Name()).selection_minmax(step_start, 1, stack_start, stack_count, block)
+            if not (np.isfinite(mins[0]) and np.isfinite(maxs[0])):
+                return None
+            if mins[0] == maxs[0]:
+                return mins[0] - 0.5, maxs[0] + 0.5
+            return mins[0], maxs[0]
+
+        limits = {}  # plane axis -> color limits
+
+        def restart():
+            nonlocal cache, prefetcher
+            prefetcher.close()
+            cache = plane_cache()
+            prefetcher = StepPrefetcher(cache, load_planes, 0, shape[axis] - 1, prefetch_depth)
+
+        def release():
+            read_status.drop()
+            prefetcher.close()
+            cache.clear()
+
+        windows.on_close(window, release)
+        windows.add_figure(window, fig)
+
+        def draw(shown, lod, values):
+            data, = values
+            plane_start = np.array(lod[0])
+            plane_start[axis] = shown
+            set_lod_image(colorax, data, plane_start, lod[1], count_dim)
+            title_start = np.array(sel_start)
+            title_start[axis] = shown
+            title.set_text(selection_title(selected_var, title_start, sel_count, step_start) + "\n plane " + str(shown) + " of axis " + str(axis))
+            series_canvas.update(autoscale_image_changed(colorax, limits.get(axis) if fixed_scale.get() else None))
+
+        # Show the current plane, reading it in the read worker only if it was not prefetched and the limits
+        # of the axis are known
+        def show(direction=1):
+            shown = plane
+            shown_axis = axis
+            lod = (lod_start, lod_count)
+            prefetcher.update(shown, direction)
+            values = cache.get(shown) if shown_axis in limits else None
+            if values is not None:
+                read_status.drop()
+                draw(shown, lod, values)
+                return
+
+            plane_cache_now = cache
+
+            def read():
+                if shown_axis not in limits:
+                    limits[shown_axis] = axis_limits(shown_axis)
+                values = plane_cache_now.get(shown)
+                if values is None:
+                    _, values = next(load_planes(shown, 1))
+                    plane_cache_now.put(shown, values)
+                return values
+
+            read_status.read("Reading plane " + str(shown), read, lambda values: draw(shown, lod, values))
+
+        def slide(value):
+            nonlocal plane
+            new_plane = int(float(value))
+            if new_plane == plane:
+                return
+            direction = 1 if new_plane > plane else -1
+            plane = new_plane
+            show(direction)
+
+        def choose_axis(event):
+            nonlocal axis, plane
+            axis = int(axis_chooser.get())
+            plane = min(max(int(sel_start[axis]), 0), shape[axis] - 1)
+            slider.config(from_=0, to=shape[axis] - 1)
+            slider.set(plane)
+            restart()
+            show()
+
+        # Re-read only the visible part of the planes after zooming or panning, the cached planes hold the old part
+        def reread():
+            nonlocal lod_start, lod_count, lod_strides
+            visible = lod_selection(ax, sel_start, sel_count, count_dim, strides)
+            if all(np.array_equal(a, b) for a, b in zip(visible, (lod_start, lod_count, lod_strides))):
+                return
+            lod_start, lod_count, lod_strides = visible
+            restart()
+            show()
+
+        on_limits_settled(window, ax, reread)
+
+        slider.config(from_=0, to=shape[axis] - 1, command=slide)
+        slider.set(plane)
+        axis_chooser.bind("<<ComboboxSelected>>", choose_axis)
+        fixed_button.config(command=show)
+
+        # Initial plot
+        show()
+
+    # Probes the selection if probe button clicked, the probe reads a batch of steps at a time
+    def check_and_probe():
+        try:
+            step_count = int(step_count_entry.get())
+        except ValueError:
+            step_count = 1
+        if plan_selection(selected_var, sel_start_entry, sel_count_entry, block_entry, step_count, False, True, paged=True):
+            plot_probe()
+
+    # Statistics of the selection over the step range, reduced in chunks in a thread of the window. The
+    # window shows the statistics and the L2 norm of each step.
+    def show_statistics():
+        var = io.InquireVariable(selected_var)
+        block = var_block(var, block_entry)
+        shape = var_shape(fr, var, block)
+        dim = len(shape)
+
+        try:
+            step_start = int(step_start_entry.get())
+        except ValueError:
+            step_start = 0
+
+        try:
+            step_count = int(step_count_entry.get())
+        except ValueError:
+            step_count = 1
+
+        try:
+            sel_start = np.array(eval(sel_start_entry.get()))
+        except (ValueError, SyntaxError):
+            sel_start = np.zeros(dim, dtype=int)
+
+        try:
+            sel_count = np.array(eval(sel_count_entry.get()))
+        except (ValueError, SyntaxError):
+            sel_count = np.ones(dim, dtype=int)
+
+        stats_window = windows.open("Statistics of " + selected_var)
+
+        header_label = tk.Label(stats_window, text="Statistics of variable " + selected_var + " with start " + str(sel_start) + " and count " + str(sel_count) + ", steps " + str(step_start) + " to " + str(step_start + step_count - 1))
+        header_label.pack(side=tk.TOP, padx=5, pady=5)
+
+        stats_text = tk.Text(stats_window, wrap=tk.NONE, width=60, height=len(stats_percentiles) + 7)
+        stats_text.pack(side=tk.TOP, padx=5, pady=5)
+
+        status_label = tk.Label(stats_window)
+        status_label.pack(side=tk.BOTTOM, padx=5, pady=5)
+
+        cancel = threading.Event()
+        done = [0]
+        result = []
+
+        def reduce():
+            try:
+                result.append(reduce_variable(fr, var, step_start, step_count, sel_start, sel_count, block,
+                                              progress=lambda steps: done.__setitem__(0, steps), cancel=cancel))
+            except Exception as e:
+                result.append(e)
+
+        def check():
+            if cancel.is_set():
+                return
+            if not result:
+                status_label.config(text="Read " + str(done[0]) + " of " + str(step_count) + " steps")
+                stats_window.after(200, check)
+                return
+            if isinstance(result[0], Exception):
+                status_label.config(text="Statistics failed: " + str(result[0]))
+                return
+            stats = result[0]
+            status_label.config(text="Read " + str(step_count) + " steps")
+            stats_text.insert(tk.END, "\n".join(stats.lines()))
+            stats_text.config(state=tk.DISABLED)
+            if step_count > 1:
+                steps, l2, _ = stats.norms()
+                fig, ax, line, title = make_1d_figure("Step", "L2 norm")
+                fig.set_size_inches(6, 3)
+                line.set_data(steps, l2)
+                ax.relim()
+                ax.autoscale_view()
+                canvas = TracedCanvas(fig, stats_window)
+                canvas.draw()
+                canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+                windows.add_figure(stats_window, fig)
+
+        windows.on_close(stats_window, cancel.set)
+
+        threading.Thread(target=reduce, daemon=True).start()
+        stats_window.after(200, check)
+
+    # Computes statistics if stats button clicked, the reduction reads one chunk at a time
+    def check_and_stats():
+        try:
+            step_count = int(step_count_entry.get())
+        except ValueError:
+            step_count = 1
+        if plan_selection(selected_var, sel_start_entry, sel_count_entry, block_entry, step_count, False, True, paged=True):
+            show_statistics()
+
+    # Displays data if display button clicked, the display reads one page at a time
+    def check_and_display():
+        try:
+            step_count = int(step_count_entry.get())
+        except ValueError:
+            step_count = 1
+        if plan_selection(selected_var, sel_start_entry, sel_count_entry, block_entry, step_count, False, True, paged=True):
+            display_nd()
     
     # Buttons' frame
     button_frame = ttk.Frame(root)
@@ -1162,15 +3667,345 @@ def show_file(bp_file):
     # Display button
     display_button = ttk.Button(button_frame, text="Display", command=check_and_display)
     display_button.pack(side=tk.LEFT, padx=5, pady=5)
-
+    # Blocks button
+    blocks_button = ttk.Button(button_frame, text="Blocks", command=show_blocks)
+    blocks_button.pack(side=tk.LEFT, padx=5, pady=5)
+    # Probe button
+    probe_button = ttk.Button(button_frame, text="Probe", command=check_and_probe)
+    probe_button.pack(side=tk.LEFT, padx=5, pady=5)
+    # Stats button
+    stats_button = ttk.Button(button_frame, text="Stats", command=check_and_stats)
+    stats_button.pack(side=tk.LEFT, padx=5, pady=5)
+    # Histogram button
+    histogram_button = ttk.Button(button_frame, text="Histogram", command=check_and_histogram)
+    histogram_button.pack(side=tk.LEFT, padx=5, pady=5)
+    # Slices button
+    slices_button = ttk.Button(button_frame, text="Slices", command=check_and_slices)
+    slices_button.pack(side=tk.LEFT, padx=5, pady=5)
+
+    memory_status = MemoryStatus(root, windows)
+    memory_status.pack(side=tk.BOTTOM, anchor=tk.W, padx=5)
+
+    # Reads of the main window, e.g. of the blocks of a variable
+    blocks_status = ReadStatus(root, read_worker)
+    blocks_status.pack(side=tk.BOTTOM, anchor=tk.W, padx=5)
+
+    def close():
+        windows.close_all()
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", close)
     root.mainloop()
 
-    fr.Close()
+    reader.close()
+
+
+# Output suffixes stitched into a video by ffmpeg, or into an animated GIF
+video_suffixes = [".mp4", ".mkv", ".avi", ".mov", ".webm", ".gif"]
+
+# Processes rendering frames in parallel when exporting a series
+render_workers = os.cpu_count() or 1
+
+
+# Save the current state of a figure as the PNG frame of a step
+def save_frame(fig, prefix, step):
+    path = prefix + "%06d.png" % step
+    with tracer.span("save_frame", "render", step=int(step)):
+        fig.savefig(path)
+    return path
+
+
+# Render frames of a step range of a 1D or 2D selection, or of a 1D selection against another 1D selection,
+# to PNG files without Tk. Opens its own engine and returns the paths of the frames in step order. The
+# scale is one of the scales of series windows, fixed over the steps of the series (first step, step count),
+# by default the rendered steps, of which a process of a pool renders a part.
+def render_frames(bp_file, var_name, step_start, step_count, sel_start, sel_count, frame_dir,
+                  x_var_name=None, x_step_start=None, x_sel_start=None, x_sel_count=None, block=None, x_block=None,
+                  scale="global", series=None):
+    reader = BPViewReader(bp_file, name="Render")
+    fr = reader.fr
+    series_start, series_count = series if series is not None else (step_start, step_count)
+
+    # Limits of the steps from the metadata, loaded before the first frame
+    def series_scale_of(name, start, sel_start, sel_count, block):
+        series_scale = SeriesScale(reader.index, fr, name, start, series_count, sel_start, sel_count, block)
+        if scale != "step":
+            series_scale.load()
+        return series_scale
+
+    var = reader.variable(var_name)
+    count_dim = [i for i in range(len(sel_count)) if sel_count[i] != 1]
+    prefix = os.path.join(frame_dir, var_name.replace("/", "_") + "_")
+    frames = []
+
+    if x_var_name is not None:
+        x_var = reader.variable(x_var_name)
+        x_count_dim = [i for i in range(len(x_sel_count)) if x_sel_count[i] != 1]
+        if len(count_dim) != 1 or len(x_count_dim) != 1:
+            raise ValueError("Both selection dimensions must be 1")
+        if x_step_start is None:
+            x_step_start = step_start
+
+        y_scale = series_scale_of(var_name, series_start, sel_start, sel_count, block)
+        x_scale = series_scale_of(x_var_name, series_start + x_step_start - step_start, x_sel_start, x_sel_count, x_block)
+        fig, ax, line, title = make_1d_figure(str(x_count_dim[0]) + "-axis", str(count_dim[0]) + "-axis")
+        decimated_line = DecimatedLine(None, ax, line)
+        selections = [ViewSelection(var, step_start, sel_start, sel_count, [sel_count[count_dim[0]]], block),
+                      ViewSelection(x_var, x_step_start, x_sel_start, x_sel_count, [x_sel_count[x_count_dim[0]]], x_block)]
+        for offset, (y_values, x_values) in iter_view_steps(fr, selections, 0, step_count):
+            decimated_line.set_data(x_values, y_values)
+            autoscale_changed(ax, x_scale.limits(x_step_start + offset, scale), y_scale.limits(step_start + offset, scale))
+            title.set_text(pair_title(var_name, x_var_name, sel_start, x_sel_start, sel_count, x_sel_count, step_start + offset, x_step_start + offset))
+            frames.append(save_frame(fig, prefix, step_start + offset))
+
+    elif len(count_dim) == 1:
+        y_scale = series_scale_of(var_name, series_start, sel_start, sel_count, block)
+        fig, ax, line, title = make_1d_figure("x-axis", "Values")
+        decimated_line = DecimatedLine(None, ax, line)
+        x_values = np.arange(sel_start[count_dim[0]], sel_start[count_dim[0]] + sel_count[count_dim[0]])
+        for step, data in enumerate(iter_steps(fr, var, step_start, step_count, sel_start, sel_count, [sel_count[count_dim[0]]], block), step_start):
+            decimated_line.set_data(x_values, data)
+            autoscale_changed(ax, None, y_scale.limits(step, scale))
+            title.set_text(selection_title(var_name, sel_start, sel_count, step))
+            frames.append(save_frame(fig, prefix, step))
+
+    elif len(count_dim) == 2:
+        color_scale = series_scale_of(var_name, series_start, sel_start, sel_count, block)
+        fig, ax, colorax, title = make_2d_figure(sel_start, sel_count, count_dim)
+        lod_start, lod_count, lod_strides = lod_selection(ax, sel_start, sel_count, count_dim)
+        if lod_strides == [1, 1]:
+            steps = iter_steps(fr, var, step_start, step_count, sel_start, sel_count, [sel_count[count_dim[0]], sel_count[count_dim[1]]], block)
+        else:
+            steps = (read_step_strided(fr, var, step, lod_start, lod_count, count_dim, lod_strides, block) for step in range(step_start, step_start + step_count))
+        for step, data in enumerate(steps, step_start):
+            set_lod_image(colorax, data, lod_start, lod_count, count_dim)
+            autoscale_image_changed(colorax, color_scale.limits(step, scale))
+            title.set_text(selection_title(var_name, sel_start, sel_count, step))
+            frames.append(save_frame(fig, prefix, step))
+
+    else:
+        reader.close()
+        raise ValueError("Selection dimension not 1 or 2")
+
+    fig.clear()
+    reader.close()
+    return frames
+
+
+# Setup of a frame rendering process, which does not inherit the settings of the main process
+def init_render_worker(batch, read, lod, index, window):
+    global lod_enabled, scale_window
+    bpview_reader.batch_budget = batch
+    bpview_reader.read_budget = read
+    bpview_reader.index_dir = index
+    lod_enabled = lod
+    scale_window = window
+    plt.switch_backend("Agg")
+
+
+# Render frames of a step range with a pool of processes. Each process opens its own engine and renders one
+# contiguous part of the range. Returns the paths of the frames in step order.
+def render_frames_parallel(bp_file, var_name, step_start, step_count, sel_start, sel_count, frame_dir,
+                           x_var_name=None, x_step_start=None, x_sel_start=None, x_sel_count=None, workers=1, block=None, x_block=None,
+                           scale="global"):
+    workers = max(1, min(workers, step_count))
+    if x_step_start is None:
+        x_step_start = step_start
+    bounds = [step_count * i // workers for i in range(workers + 1)]
+
+    # Spawned processes do not inherit the Tk interpreter or locks held by reader threads
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=init_render_worker, initargs=(bpview_reader.batch_budget, bpview_reader.read_budget, lod_enabled, bpview_reader.index_dir, scale_window)) as pool:
+        parts = [pool.submit(render_frames, bp_file, var_name, step_start + first, last - first, sel_start, sel_count, frame_dir,
+                             x_var_name, x_step_start + first, x_sel_start, x_sel_count, block, x_block, scale, (step_start, step_count))
+                 for first, last in zip(bounds, bounds[1:])]
+        frames = []
+        for part in parts:
+            frames += part.result()
+    return frames
+
+
+# Stitch PNG frames into an animated GIF with Pillow or into a video with ffmpeg
+def stitch_frames(frames, output, fps):
+    if output.lower().endswith(".gif"):
+        from PIL import Image  # Pillow is a dependency of Matplotlib
+        images = (Image.open(frame) for frame in frames[1:])
+        Image.open(frames[0]).save(output, save_all=True, append_images=images, duration=1000 / fps, loop=0)
+        return
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise ValueError("ffmpeg is needed to write " + output)
+    list_path = os.path.join(os.path.dirname(frames[0]), "frames.txt")
+    with open(list_path, "w") as list_file:
+        for frame in frames:
+            list_file.write("file '" + os.path.abspath(frame) + "'\nduration " + str(1 / fps) + "\n")
+    subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path,
+                    "-r", str(fps), "-pix_fmt", "yuv420p", output], check=True)
+
+
+# Render a step range of a selection without a display, as PNG frames in the output directory or stitched
+# into the output video or GIF. Frames are rendered in this process, or by a pool of that many worker processes,
+# with the scale of a series window.
+def render_series(bp_file, var_name, step_start, step_count, sel_start, sel_count, output, fps=10,
+                  x_var_name=None, x_step_start=None, x_sel_start=None, x_sel_count=None, workers=None, block=None, x_block=None,
+                  scale="global"):
+    video = os.path.splitext(output)[1].lower() in video_suffixes
+    frame_dir = tempfile.mkdtemp(prefix="bpview_") if video else output
+    os.makedirs(frame_dir, exist_ok=True)
+    try:
+        if workers is None:
+            frames = render_frames(bp_file, var_name, step_start, step_count, sel_start, sel_count, frame_dir,
+                                   x_var_name, x_step_start, x_sel_start, x_sel_count, block, x_block, scale)
+        else:
+            frames = render_frames_parallel(bp_file, var_name, step_start, step_count, sel_start, sel_count, frame_dir,
+                                            x_var_name, x_step_start, x_sel_start, x_sel_count, workers, block, x_block, scale)
+        if video:
+            stitch_frames(frames, output, fps)
+    finally:
+        if video:
+            shutil.rmtree(frame_dir)
+    return len(frames)
+
+
+# Parse "start:stop" into the first step and step count of steps start to stop - 1, or "step" into one step
+def parse_steps(steps):
+    if ":" in steps:
+        first, stop = steps.split(":")
+        return int(first), int(stop) - int(first)
+    return int(steps), 1
+
+
+# Selection start and count of a variable from command line lists, by default the whole variable or block
+def parse_selection(bp_file, var_name, start_str, count_str, block=None):
+    try:
+        start = eval(start_str) if start_str is not None else None
+        count = eval(count_str) if count_str is not None else None
+    except (SyntaxError, NameError) as e:
+        raise ValueError("Selection " + str(start_str) + " " + str(count_str) + " is not a list: " + str(e))
+    with BPViewReader(bp_file, name="Shape") as reader:
+        return reader.selection(var_name, start, count, block)
+
+
+# Statistics of a selection of a variable over a step range, by default all steps, with its own engine
+def statistics_of(bp_file, var_name, step_start, step_count, sel_start, sel_count, block=None, threads=None):
+    with BPViewReader(bp_file, name="Statistics") as reader:
+        var = reader.variable(var_name)
+        if step_count is None:
+            step_count = var.Steps() - step_start
+        return reduce_variable(reader.fr, var, step_start, step_count, sel_start, sel_count, block, threads)
+
 
 # Execute code if running in main
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--bp_file", "-b", help="Path to the BP file", required=True)
+    # Read options shared by the GUI and the commands, given before or after the command. The copies of the
+    # commands have no defaults, so that they only replace the values given before the command when given.
+    def make_read_options(suppress):
+        def default(value):
+            return argparse.SUPPRESS if suppress else value
+
+        options = argparse.ArgumentParser(add_help=False)
+        options.add_argument("--batch_mb", type=int, default=default(512), help="Memory budget in MB of one multi-step read")
+        options.add_argument("--read_mb", type=int, default=default(1024), help="Memory budget in MB of the data of one selection")
+        options.add_argument("--full_res", action="store_true", default=default(False), help="Read 2D plots at full resolution instead of the resolution of the canvas")
+        options.add_argument("--no_index", action="store_true", default=default(False), help="Always read the metadata instead of keeping an index in " + bpview_reader.index_dir)
+        options.add_argument("--workers", type=int, default=default(os.cpu_count() or 1), help="Processes rendering frames in parallel when exporting a series")
+        options.add_argument("--trace", default=default(None), help="Write the reads, conversions and draws as a Chrome trace to this JSON file when the program ends")
+        return options
+
+    read_options = make_read_options(True)
+
+    parser = argparse.ArgumentParser(parents=[make_read_options(False)])
+    parser.add_argument("--bp_file", "-b", help="Path to the BP file")
+    parser.add_argument("--cache_mb", type=int, default=256, help="Memory budget in MB of the step cache of each series window")
+    parser.add_argument("--prefetch", type=int, default=4, help="Number of steps read ahead in series windows")
+    parser.add_argument("--scale", choices=["step", "global", "rolling"], default="global", help="Scale of series windows: autoscaled to each step, or fixed over all or the nearby steps from the metadata")
+    parser.add_argument("--scale_window", type=int, default=10, help="Steps on each side of the current step of a rolling scale")
+    parser.add_argument("--follow", action="store_true", help="Follow a file or stream while it is written, showing the newest steps")
+    parser.add_argument("--engine", help="Engine of a followed file or stream, BP5 by default or e.g. SST")
+    subparsers = parser.add_subparsers(dest="command")
+
+    render_parser = subparsers.add_parser("render", parents=[read_options], help="Render plots of a step range to PNG frames or a video without a display")
+    render_parser.add_argument("--bp_file", "-b", help="Path to the BP file", required=True)
+    render_parser.add_argument("--var", required=True, help="Variable to plot")
+    render_parser.add_argument("--steps", default="0", help="Steps to plot, as start:stop or a single step")
+    render_parser.add_argument("--start", help="Selection start, e.g. [0,0,0], by default zeros")
+    render_parser.add_argument("--count", help="Selection count, e.g. [1,64,64], by default the rest of the variable")
+    render_parser.add_argument("--block", type=int, help="Writer block of a local array, the selection is within the block")
+    render_parser.add_argument("--x_var", help="Variable plotted on the x-axis of a 1D v 1D plot")
+    render_parser.add_argument("--x_step_start", type=int, help="First step of the x variable, by default the first plotted step")
+    render_parser.add_argument("--x_start", help="Selection start of the x variable")
+    render_parser.add_argument("--x_count", help="Selection count of the x variable")
+    render_parser.add_argument("--x_block", type=int, help="Writer block of a local array x variable, the x selection is within the block")
+    render_parser.add_argument("--output", "-o", required=True, help="Directory of the PNG frames, or a video (.mp4, .mkv, .avi, .mov, .webm) or .gif file")
+    render_parser.add_argument("--fps", type=float, default=10, help="Frames per second of a video or GIF")
+    render_parser.add_argument("--scale", choices=["step", "global", "rolling"], default=argparse.SUPPRESS, help="Scale of the frames like in series windows, by default global")
+    render_parser.add_argument("--scale_window", type=int, default=argparse.SUPPRESS, help="Steps on each side of the current step of a rolling scale")
+    stats_parser = subparsers.add_parser("stats", parents=[read_options], help="Statistics of a selection over a step range, read in chunks")
+    stats_parser.add_argument("--bp_file", "-b", help="Path to the BP file", required=True)
+    stats_parser.add_argument("--var", required=True, help="Variable to reduce")
+    stats_parser.add_argument("--steps", help="Steps to reduce, as start:stop or a single step, by default all steps")
+    stats_parser.add_argument("--start", help="Selection start, e.g. [0,0,0], by default zeros")
+    stats_parser.add_argument("--count", help="Selection count, e.g. [1,64,64], by default the rest of the variable")
+    stats_parser.add_argument("--block", type=int, help="Writer block of a local array, the selection is within the block")
+    stats_parser.add_argument("--threads", type=int, default=stats_threads, help="Threads reducing chunks of the variable")
+    stats_parser.add_argument("--chunk_mb", type=int, default=64, help="Memory budget in MB of one chunk")
+    stats_parser.add_argument("--per_step", action="store_true", help="Also print the L2 norm and largest magnitude of every step")
     args = parser.parse_args()
 
-    show_file(args.bp_file)
+    bpview_reader.batch_budget = args.batch_mb * 1024 * 1024
+    bpview_reader.read_budget = args.read_mb * 1024 * 1024
+    lod_enabled = not args.full_res
+    render_workers = max(1, args.workers)
+    if args.no_index:
+        bpview_reader.index_dir = None
+    if args.trace is not None:
+        bpview_reader.trace_file = args.trace
+        # Frames rendered in other processes would be missing from the trace
+        render_workers = 1
+
+    try:
+        if args.command == "render":
+            plt.switch_backend("Agg")
+            scale_window = args.scale_window
+            try:
+                step_start, step_count = parse_steps(args.steps)
+                sel_start, sel_count = parse_selection(args.bp_file, args.var, args.start, args.count, args.block)
+                x_sel_start = x_sel_count = None
+                if args.x_var is not None:
+                    x_sel_start, x_sel_count = parse_selection(args.bp_file, args.x_var, args.x_start, args.x_count, args.x_block)
+                frame_count = render_series(args.bp_file, args.var, step_start, step_count, sel_start, sel_count, args.output, args.fps,
+                                            args.x_var, args.x_step_start, x_sel_start, x_sel_count,
+                                            render_workers if render_workers > 1 else None, args.block, args.x_block, args.scale)
+            except ValueError as e:
+                parser.exit(1, "bpview.py render: error: " + str(e) + "\n")
+            print("Rendered " + str(frame_count) + " frames to " + args.output)
+        elif args.command == "stats":
+            stats_chunk_budget = args.chunk_mb * 1024 * 1024
+            try:
+                step_start, step_count = parse_steps(args.steps) if args.steps is not None else (0, None)
+                sel_start, sel_count = parse_selection(args.bp_file, args.var, args.start, args.count, args.block)
+                stats = statistics_of(args.bp_file, args.var, step_start, step_count, sel_start, sel_count, args.block, max(1, args.threads))
+            except ValueError as e:
+                parser.exit(1, "bpview.py stats: error: " + str(e) + "\n")
+            for line in stats.lines():
+                print(line)
+            if args.per_step:
+                print("Step, L2 norm, Largest magnitude")
+                for step, l2, largest in zip(*stats.norms()):
+                    print(str(step) + ", " + str(l2) + ", " + str(largest))
+        else:
+            if args.bp_file is None:
+                parser.error("the following arguments are required: --bp_file/-b")
+            cache_budget = args.cache_mb * 1024 * 1024
+            prefetch_depth = args.prefetch
+            series_scale = args.scale
+            scale_window = args.scale_window
+            if args.follow:
+                follow_file(args.bp_file, args.engine)
+            else:
+                show_file(args.bp_file)
+    finally:
+        if args.trace is not None:
+            tracer.save(args.trace)
+            print("Wrote trace of " + str(len(tracer.events)) + " events to " + args.trace)
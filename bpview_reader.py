@@ -0,0 +1,728 @@
+#!/usr/bin/env python3
+# Reading of ADIOS2 BP files shared by bpview.py, its commands and scripts or notebooks, without Tk and
+# matplotlib. Reads go into arrays of the type the variables were written with, in batches bounded by the
+# read budgets, and are timed for the status bars and traces of bpview.py:
+#   from bpview_reader import BPViewReader
+#   with BPViewReader("file.bp") as reader:
+#       data = reader.read("T", steps=range(0, 100), start=[0, 0], count=[64, 64])
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+import numpy as np
+import adios2
+
+
+# Memory budget in bytes of one batched multi-step read
+batch_budget = 512 * 1024 * 1024
+
+# Memory budget in bytes of the data of one selection read by a window or command
+read_budget = 1024 * 1024 * 1024
+
+# ADIOS2 engines are not thread safe, so every read holds this lock
+engine_lock = threading.Lock()
+
+# Path of the Chrome trace of the reads and draws written when the program ends, None when not tracing
+trace_file = None
+
+# Trace events kept at most, the oldest are dropped
+trace_limit = 1000000
+
+
+# Time and bytes of the reads, conversions and draws of one window or reader, shown in the status bar of a window
+class TraceStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reads = 0
+        self.read_bytes = 0
+        self.read_s = 0.0
+        self.metadata_s = 0.0
+        self.conversions = 0
+        self.draws = 0
+        self.draw_s = 0.0
+        self.last_draw_s = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add(self, name, cat, duration, args):
+        with self.lock:
+            if cat == "io":
+                self.reads += 1
+                self.read_bytes += args.get("bytes", 0)
+                self.read_s += duration
+            elif cat == "metadata":
+                self.metadata_s += duration
+            elif cat == "convert":
+                self.conversions += 1
+            elif cat == "render":
+                self.draw_s += duration
+                if name in ("draw", "blit"):
+                    self.draws += 1
+                    self.last_draw_s = duration
+            elif name == "cache_hit":
+                self.cache_hits += 1
+            elif name == "cache_miss":
+                self.cache_misses += 1
+
+    def text(self):
+        with self.lock:
+            return (str(self.reads) + " reads, " + str(round(self.read_bytes / 2**20, 1)) + " MB in " + str(round(self.read_s, 3)) + " s, "
+                    + "metadata " + str(round(self.metadata_s, 3)) + " s, " + str(self.conversions) + " conversions, "
+                    + str(self.draws) + " draws, last " + str(round(self.last_draw_s * 1000)) + " ms, "
+                    + "cache " + str(self.cache_hits) + " hits " + str(self.cache_misses) + " misses")
+
+
+# Spans of the reads and draws: added to the stats of the window they run for, given explicitly or
+# attributed to the thread, and kept as Chrome trace events when tracing
+class Tracer:
+    def __init__(self):
+        self.events = deque(maxlen=trace_limit)
+        self.threads = {}
+        self.local = threading.local()
+        self.origin = time.perf_counter()
+
+    # Add the spans of the current thread to stats until the block ends
+    @contextmanager
+    def attribute(self, stats):
+        previous = getattr(self.local, "stats", None)
+        self.local.stats = stats
+        try:
+            yield
+        finally:
+            self.local.stats = previous
+
+    def record(self, name, cat, start, duration, stats, args):
+        if stats is None:
+            stats = getattr(self.local, "stats", None)
+        if stats is not None:
+            stats.add(name, cat, duration, args)
+        if trace_file is None:
+            return
+        tid = threading.get_ident()
+        if tid not in self.threads:
+            self.threads[tid] = threading.current_thread().name
+        event = {"name": name, "cat": cat, "ph": "X" if duration is not None else "i", "ts": (start - self.origin) * 1e6,
+                 "pid": os.getpid(), "tid": tid, "args": args}
+        if duration is not None:
+            event["dur"] = duration * 1e6
+        else:
+            event["s"] = "t"
+        self.events.append(event)
+
+    # Time a block, the block can add arguments such as the bytes it read to the yielded dictionary
+    @contextmanager
+    def span(self, name, cat, stats=None, **args):
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.record(name, cat, start, time.perf_counter() - start, stats, args)
+
+    def instant(self, name, cat, stats=None, **args):
+        self.record(name, cat, time.perf_counter(), None, stats, args)
+
+    # Write the events as a Chrome trace, which chrome://tracing and Perfetto open
+    def save(self, path):
+        names = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                 for tid, name in self.threads.items()]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": names + list(self.events), "displayTimeUnit": "ms"}, f)
+
+
+tracer = Tracer()
+
+
+# NumPy dtypes of the ADIOS2 variable types
+adios_dtypes = {
+    "char": np.int8,
+    "int8_t": np.int8,
+    "uint8_t": np.uint8,
+    "int16_t": np.int16,
+    "uint16_t": np.uint16,
+    "int32_t": np.int32,
+    "uint32_t": np.uint32,
+    "int64_t": np.int64,
+    "uint64_t": np.uint64,
+    "float": np.float32,
+    "double": np.float64,
+    "long double": np.longdouble,
+    "float complex": np.complex64,
+    "double complex": np.complex128,
+}
+
+
+# Dtype of the arrays a variable is read into, the type it was written with
+def var_dtype(var):
+    return np.dtype(adios_dtypes.get(var.Type(), np.float64))
+
+
+# Raised instead of allocating an array larger than the read budget
+class ReadBudgetError(ValueError):
+    pass
+
+
+# Check the size of an array before it is allocated
+def check_read_budget(data_shape, dtype):
+    nbytes = int(np.prod(data_shape)) * np.dtype(dtype).itemsize
+    if nbytes > read_budget:
+        raise ReadBudgetError("Reading " + str(list(data_shape)) + " values needs " + str(nbytes // 2**20) + " MB, more than the read budget of " + str(read_budget // 2**20) + " MB")
+
+
+# Check that a selection has the dimensions of a shape and lies within it
+def check_selection(var_name, sel_start, sel_count, shape):
+    sel_start = [int(i) for i in sel_start]
+    sel_count = [int(i) for i in sel_count]
+    shape = [int(i) for i in shape]
+    if len(sel_start) != len(shape) or len(sel_count) != len(shape):
+        raise ValueError("Selection " + str(sel_start) + " " + str(sel_count) + " does not have the " + str(len(shape)) + " dimensions of " + var_name)
+    for start, count, size in zip(sel_start, sel_count, shape):
+        if start < 0 or count < 1 or start + count > size:
+            raise ValueError("Selection " + str(sel_start) + " " + str(sel_count) + " is outside the shape " + str(shape) + " of " + var_name)
+
+
+# Local arrays have no global shape, they are read one writer block at a time
+def is_local_array(var):
+    return var.ShapeID() == adios2.ShapeID.LocalArray
+
+
+# Shape of a variable, or the count of one of its writer blocks at a step for local arrays
+def var_shape(fr, var, block=None, step=0):
+    if block is None:
+        return var.Shape()
+    with engine_lock, tracer.span("blocks_info", "metadata", var=var.Name(), step=int(step)):
+        blocks = fr.BlocksInfo(var.Name(), step)
+    if not 0 <= block < len(blocks):
+        raise ValueError("Block " + str(block) + " not found at step " + str(step) + " of " + var.Name())
+    return block_box(blocks[block])[1]
+
+
+# Start and count of a writer block from its metadata. The engines leave the start of local array blocks
+# and the start and count of scalars empty, the start is then zeros.
+def block_box(block):
+    count = [int(i) for i in block["Count"].split(",")] if block["Count"] else []
+    start = [int(i) for i in block["Start"].split(",")] if block["Start"] else []
+    return start + [0] * (len(count) - len(start)), count
+
+
+# Select steps and a box of a variable, the box within a writer block when a block is given. Scalars have
+# no box.
+def select(var, step, step_count, sel_start, sel_count, block=None):
+    var.SetStepSelection([step, step_count])
+    if block is not None:
+        var.SetBlockSelection(block)
+    if len(sel_count):
+        var.SetSelection([sel_start, sel_count])
+
+
+# Read one step of a selection into a new array
+def read_step(fr, var, step, sel_start, sel_count, data_shape, block=None):
+    check_read_budget(data_shape, var_dtype(var))
+    data = np.empty(data_shape, dtype=var_dtype(var))
+    with engine_lock, tracer.span("get", "io", var=var.Name(), step=int(step), bytes=data.nbytes, elements=int(data.size), dtype=str(data.dtype)):
+        select(var, step, 1, sel_start, sel_count, block)
+        fr.Get(var, data, adios2.Mode.Sync)
+    return data
+
+
+# Read a step range of a selection with one multi-step read per batch, as many steps per batch as fit in
+# the batch budget. Yields the first step of each batch and its [steps, *data_shape] array. Block
+# selections are read one step at a time, the engines do not read them over several steps. Given a
+# [step_count, *data_shape] array, the batches are read into its rows and the yielded arrays are views of it.
+def read_steps(fr, var, step_start, step_count, sel_start, sel_count, data_shape, block=None, out=None):
+    dtype = var_dtype(var)
+    step_bytes = int(np.prod(data_shape)) * dtype.itemsize
+    batch = max(1, min(step_count, min(batch_budget, read_budget) // max(step_bytes, 1)))
+    if block is not None:
+        batch = 1
+    for first in range(step_start, step_start + step_count, batch):
+        count = min(batch, step_start + step_count - first)
+        if out is not None:
+            data = out[first - step_start:first - step_start + count]
+        else:
+            check_read_budget([count] + list(data_shape), dtype)
+            data = np.empty([count] + list(data_shape), dtype=dtype)
+        with engine_lock, tracer.span("get_steps", "io", var=var.Name(), step=int(first), steps=int(count), bytes=data.nbytes, elements=int(data.size), dtype=str(dtype)):
+            select(var, first, count, sel_start, sel_count, block)
+            fr.Get(var, data, adios2.Mode.Sync)
+        yield first, data
+
+
+# Read a step range of a selection in batches and yield the array of each step in order
+def iter_steps(fr, var, step_start, step_count, sel_start, sel_count, data_shape, block=None):
+    for first, batch in read_steps(fr, var, step_start, step_count, sel_start, sel_count, data_shape, block):
+        for data in batch:
+            yield data
+
+
+# One selection of a view that reads several variables together: a variable, the first step of its
+# series, its box (within a writer block for local arrays) and the shape of the data of one step
+class ViewSelection:
+    def __init__(self, var, step, sel_start, sel_count, data_shape, block=None):
+        self.var = var
+        self.step = step
+        self.sel_start = sel_start
+        self.sel_count = sel_count
+        self.data_shape = list(data_shape)
+        self.block = block
+        self.dtype = var_dtype(var)
+        self.step_bytes = int(np.prod(self.data_shape)) * self.dtype.itemsize
+
+
+# Read a range of step offsets of all selections of a view, each from its own first step. The gets of
+# all selections are queued as deferred gets and read with one PerformGets per batch of steps, so that
+# the engine can merge and order the reads of the variables. Yields the first offset of each batch and
+# one [steps, *data_shape] array per selection.
+def read_view_steps(fr, selections, first, count):
+    step_bytes = sum(s.step_bytes for s in selections)
+    batch = max(1, min(count, min(batch_budget, read_budget) // max(step_bytes, 1)))
+    if any(s.block is not None for s in selections):
+        batch = 1
+    for offset in range(first, first + count, batch):
+        steps = min(batch, first + count - offset)
+        for s in selections:
+            check_read_budget([steps] + s.data_shape, s.dtype)
+        arrays = [np.empty([steps] + s.data_shape, dtype=s.dtype) for s in selections]
+        with engine_lock, tracer.span("perform_gets", "io", variables=[s.var.Name() for s in selections], step=int(offset), steps=int(steps),
+                                      bytes=sum(a.nbytes for a in arrays), elements=sum(int(a.size) for a in arrays)):
+            for s, data in zip(selections, arrays):
+                select(s.var, s.step + offset, steps, s.sel_start, s.sel_count, s.block)
+                fr.Get(s.var, data, adios2.Mode.Deferred)
+            fr.PerformGets()
+        yield offset, arrays
+
+
+# Read a range of step offsets of the selections of a view in batches and yield each offset with the
+# tuple of the arrays of its step
+def iter_view_steps(fr, selections, first, count):
+    for offset, arrays in read_view_steps(fr, selections, first, count):
+        for i in range(len(arrays[0])):
+            yield offset + i, tuple(data[i] for data in arrays)
+
+
+# Read one step offset of the selections of a view with one PerformGets, returns a tuple of arrays
+def read_view_step(fr, selections, offset=0):
+    for _, values in iter_view_steps(fr, selections, offset, 1):
+        return values
+
+
+# Memory budget in bytes of the rows read together by one strided read
+lod_group_budget = 16 * 1024 * 1024
+
+
+# Read one step of a 2D selection keeping every stride-th row and column. Only the kept rows are read,
+# in groups of deferred single-row gets, and their columns are decimated in memory.
+def read_step_strided(fr, var, step, sel_start, sel_count, count_dim, strides, block=None):
+    rows = sel_count[count_dim[0]]
+    cols = sel_count[count_dim[1]]
+    if strides == [1, 1]:
+        return read_step(fr, var, step, sel_start, sel_count, [rows, cols], block)
+
+    dtype = var_dtype(var)
+    kept_rows = range(0, rows, strides[0])
+    check_read_budget([len(kept_rows), len(range(0, cols, strides[1]))], dtype)
+    data = np.empty([len(kept_rows), len(range(0, cols, strides[1]))], dtype=dtype)
+    group = max(1, min(len(kept_rows), lod_group_budget // (cols * dtype.itemsize)))
+    buffer = np.empty([group, cols], dtype=dtype)
+    row_start = np.array(sel_start)
+    row_count = np.array(sel_count)
+    row_count[count_dim[0]] = 1
+    for first in range(0, len(kept_rows), group):
+        group_rows = kept_rows[first:first + group]
+        with engine_lock, tracer.span("get_rows", "io", var=var.Name(), step=int(step), rows=len(group_rows), bytes=len(group_rows) * buffer[0].nbytes,
+                                      elements=len(group_rows) * int(cols), dtype=str(dtype)):
+            for i, row in enumerate(group_rows):
+                row_start[count_dim[0]] = sel_start[count_dim[0]] + row
+                select(var, step, 1, row_start, row_count, block)
+                fr.Get(var, buffer[i], adios2.Mode.Deferred)
+            fr.PerformGets()
+        data[first:first + len(group_rows)] = buffer[:len(group_rows), ::strides[1]]
+    return data
+
+
+# Read consecutive planes of a 2D selection along a plane axis at one step. Full resolution planes are read
+# with one read of their box, strided planes one after another. Returns a [planes, rows, columns] array.
+def read_planes(fr, var, step, sel_start, sel_count, count_dim, strides, axis, first, count, block=None):
+    plane_start = np.array(sel_start)
+    plane_start[axis] = first
+    if strides == [1, 1]:
+        box_count = np.array(sel_count)
+        box_count[axis] = count
+        data = read_step(fr, var, step, plane_start, box_count, box_count, block)
+        return np.moveaxis(data, axis, 0).reshape(count, sel_count[count_dim[0]], sel_count[count_dim[1]])
+    planes = []
+    for plane in range(first, first + count):
+        plane_start[axis] = plane
+        planes.append(read_step_strided(fr, var, step, plane_start, sel_count, count_dim, strides, block))
+    return np.stack(planes)
+
+
+# Read one step of a 1D or 2D selection keeping every stride-th value along the counted dimensions.
+# 1D selections are read in chunks of the strided read budget and decimated in memory.
+def read_step_decimated(fr, var, step, sel_start, sel_count, count_dim, strides, block=None):
+    if len(count_dim) == 2:
+        return read_step_strided(fr, var, step, sel_start, sel_count, count_dim, strides, block)
+    d = count_dim[0]
+    values = sel_count[d]
+    if strides[0] == 1:
+        return read_step(fr, var, step, sel_start, sel_count, [values], block)
+
+    dtype = var_dtype(var)
+    check_read_budget([len(range(0, values, strides[0]))], dtype)
+    data = np.empty(len(range(0, values, strides[0])), dtype=dtype)
+    chunk = max(1, lod_group_budget // (dtype.itemsize * strides[0])) * strides[0]
+    chunk_start = np.array(sel_start)
+    chunk_count = np.array(sel_count)
+    for first in range(0, values, chunk):
+        chunk_start[d] = sel_start[d] + first
+        chunk_count[d] = min(chunk, values - first)
+        kept = read_step(fr, var, step, chunk_start, chunk_count, [chunk_count[d]], block)[::strides[0]]
+        data[first // strides[0]:first // strides[0] + len(kept)] = kept
+    return data
+
+
+# Least recently used cache of step data, evicting old steps above the memory budget
+class StepCache:
+    def __init__(self, budget, stats=None):
+        self.budget = budget
+        self.stats = stats  # stats of the window, counting hits and misses and the prefetched reads
+        self.nbytes = 0
+        self.entries = OrderedDict()  # step -> tuple of arrays
+        self.lock = threading.Lock()
+
+    def __contains__(self, step):
+        with self.lock:
+            return step in self.entries
+
+    def get(self, step):
+        with self.lock:
+            arrays = self.entries.get(step)
+            if arrays is not None:
+                self.entries.move_to_end(step)
+        tracer.instant("cache_hit" if arrays is not None else "cache_miss", "cache", self.stats, key=str(step))
+        return arrays
+
+    def put(self, step, arrays):
+        size = sum(a.nbytes for a in arrays)
+        if size > self.budget:
+            return
+        with self.lock:
+            if step in self.entries:
+                self.nbytes -= sum(a.nbytes for a in self.entries.pop(step))
+            self.entries[step] = arrays
+            self.nbytes += size
+            while self.nbytes > self.budget:
+                _, old = self.entries.popitem(last=False)
+                self.nbytes -= sum(a.nbytes for a in old)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+
+# Directory of the metadata indexes of opened files, None to always read the metadata
+index_dir = os.path.join(os.path.expanduser("~"), ".cache", "bpview")
+
+# Version of the index format, indexes of other versions are rebuilt
+index_version = 1
+
+
+# Blocks of a variable at every step: blocks of step i are rows offsets[i] to offsets[i + 1] of the
+# starts, counts, minima and maxima arrays
+class BlockLayout:
+    def __init__(self, offsets, starts, counts, mins, maxs):
+        self.offsets = offsets
+        self.starts = starts
+        self.counts = counts
+        self.mins = mins
+        self.maxs = maxs
+
+    @classmethod
+    def read(cls, fr, var_name, step_count):
+        offsets = [0]
+        starts = []
+        counts = []
+        mins = []
+        maxs = []
+        for step in range(step_count):
+            with engine_lock, tracer.span("blocks_info", "metadata", var=var_name, step=int(step)):
+                blocks = fr.BlocksInfo(var_name, step)
+            for block in blocks:
+                start, count = block_box(block)
+                starts.append(start)
+                counts.append(count)
+                mins.append(metadata_value(block["Min"]))
+                maxs.append(metadata_value(block["Max"]))
+            offsets.append(len(starts))
+        return cls(np.array(offsets, dtype=np.int64), np.array(starts, dtype=np.int64), np.array(counts, dtype=np.int64),
+                   np.array(mins, dtype=np.float64), np.array(maxs, dtype=np.float64))
+
+    def step_count(self):
+        return len(self.offsets) - 1
+
+    # Blocks of a step intersecting a box, as a boolean array over the blocks of the step
+    def intersecting(self, step, sel_start, sel_count):
+        starts = self.starts[self.offsets[step]:self.offsets[step + 1]]
+        counts = self.counts[self.offsets[step]:self.offsets[step + 1]]
+        sel_start = np.asarray(sel_start, dtype=np.int64)
+        sel_end = sel_start + np.asarray(sel_count, dtype=np.int64)
+        if starts.shape[1:] != sel_start.shape:
+            return np.zeros(len(starts), dtype=bool)
+        return np.all((starts < sel_end) & (starts + counts > sel_start), axis=1)
+
+    # Minimum and maximum of the blocks a selection touches at each step of a range, NaN where unknown.
+    # For local arrays the selection is within one block.
+    def selection_minmax(self, step_start, step_count, sel_start, sel_count, block=None):
+        mins = np.full(step_count, np.nan)
+        maxs = np.full(step_count, np.nan)
+        for i, step in enumerate(range(step_start, min(step_start + step_count, self.step_count()))):
+            first = self.offsets[step]
+            last = self.offsets[step + 1]
+            if block is not None:
+                touched = np.arange(last - first) == block
+            else:
+                touched = self.intersecting(step, sel_start, sel_count)
+            if touched.any():
+                mins[i] = np.fmin.reduce(self.mins[first:last][touched])
+                maxs[i] = np.fmax.reduce(self.maxs[first:last][touched])
+        return mins, maxs
+
+    # Minimum and maximum of every step from the minima and maxima of its blocks
+    def step_minmax(self):
+        step_mins = np.full(self.step_count(), np.nan)
+        step_maxs = np.full(self.step_count(), np.nan)
+        nonempty = self.offsets[1:] > self.offsets[:-1]
+        if len(self.mins):
+            step_mins[nonempty] = np.fmin.reduceat(self.mins, self.offsets[:-1][nonempty])
+            step_maxs[nonempty] = np.fmax.reduceat(self.maxs, self.offsets[:-1][nonempty])
+        return step_mins, step_maxs
+
+
+# Number in the metadata, NaN for the minima and maxima of complex and string variables
+def metadata_value(value):
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+# Metadata of a BP file kept in an index file, so that reopening the file does not rebuild the catalog.
+# The index belongs to the sizes and modification times of the metadata files, and is rebuilt when a run
+# appends steps. The block layout of a variable is read from the engine the first time it is needed, by
+# one thread at a time as the windows read them in their read threads.
+class FileIndex:
+    def __init__(self, bp_file, io):
+        self.path = os.path.abspath(bp_file)
+        self.key = None
+        self.file = None
+        if index_dir is not None:
+            self.key = self.metadata_key()
+            self.file = os.path.join(index_dir, hashlib.sha1(self.path.encode()).hexdigest() + ".idx")
+        self.variables = None
+        self.layouts = {}
+        self.changed = False
+        self.lock = threading.Lock()
+
+        with tracer.span("load_index", "metadata", path=self.path) as args:
+            stored = self.load()
+            args["indexed"] = stored is not None
+        if stored is not None:
+            self.variables = stored["variables"]
+            self.layouts = {name: BlockLayout(*arrays) for name, arrays in stored["layouts"].items()}
+        else:
+            with tracer.span("available_variables", "metadata", path=self.path):
+                self.variables = io.AvailableVariables()
+            self.changed = True
+            self.save()
+
+    # Sizes and modification times of the metadata files of a BP4/BP5 directory, or of a BP3 file
+    def metadata_key(self):
+        if not os.path.isdir(self.path):
+            stat = os.stat(self.path)
+            return [("", stat.st_size, stat.st_mtime_ns)]
+        key = []
+        for name in sorted(name for name in os.listdir(self.path) if name.startswith(("md.", "mmd."))):
+            stat = os.stat(os.path.join(self.path, name))
+            key.append((name, stat.st_size, stat.st_mtime_ns))
+        return key
+
+    def load(self):
+        if self.file is None:
+            return None
+        try:
+            with open(self.file, "rb") as f:
+                stored = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        if stored.get("version") != index_version or stored.get("path") != self.path or stored.get("key") != self.key:
+            return None
+        return stored
+
+    # Write the index if it changed, through a temporary file so that a concurrent reader never sees half of it
+    def save(self):
+        if self.file is None or not self.changed:
+            return
+        with self.lock:
+            layouts = {name: (layout.offsets, layout.starts, layout.counts, layout.mins, layout.maxs)
+                       for name, layout in self.layouts.items()}
+        stored = {
+            "version": index_version,
+            "path": self.path,
+            "key": self.key,
+            "variables": self.variables,
+            "layouts": layouts,
+        }
+        try:
+            os.makedirs(index_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=index_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(stored, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.file)
+            self.changed = False
+        except OSError as e:
+            print("Could not write the index " + self.file + ": " + str(e))
+
+    def blocks(self, fr, var_name):
+        with self.lock:
+            layout = self.layouts.get(var_name)
+            if layout is None:
+                layout = BlockLayout.read(fr, var_name, int(self.variables[var_name]["AvailableStepsCount"]))
+                self.layouts[var_name] = layout
+                self.changed = True
+        return layout
+
+
+# Steps of a variable: all steps for None, one step for an integer, counted from the last step when negative,
+# or a range or slice of consecutive steps. Returns the first step, the number of steps and whether a single
+# step was asked for.
+def step_range(steps, available):
+    if steps is None:
+        return 0, available, False
+    if isinstance(steps, slice):
+        steps = range(*steps.indices(available))
+    if isinstance(steps, range):
+        if steps.step != 1 or len(steps) == 0:
+            raise ValueError("Steps " + str(steps) + " are not consecutive increasing steps")
+        if steps.start < 0 or steps.stop > available:
+            raise ValueError("Steps " + str(steps) + " are outside the " + str(available) + " steps")
+        return steps.start, len(steps), False
+    step = int(steps)
+    if step < 0:
+        step += available
+    if not 0 <= step < available:
+        raise ValueError("Step " + str(steps) + " is outside the " + str(available) + " steps")
+    return step, 1, True
+
+
+# A BP file opened for random access reads. Variables are read by name into arrays of the type they were
+# written with: one step as a [*count] array, several steps as one [steps, *count] array that the batches
+# of multi-step reads are read into. Single steps are kept in a step cache when a cache budget is given,
+# the cached arrays are shared and read-only. The variables and block layouts come from the index.
+class BPViewReader:
+    def __init__(self, bp_file, engine=None, cache_budget=0, name="BPViewReader"):
+        self.bp_file = bp_file
+        self.adios = adios2.ADIOS()
+        self.io = self.adios.DeclareIO(name)
+        if engine is not None:
+            self.io.SetEngine(engine)
+        self.fr = self.io.Open(bp_file, adios2.Mode.ReadRandomAccess)
+        self.stats = TraceStats()
+        self.cache = StepCache(cache_budget, self.stats)
+        self.file_index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Index of the file, loaded or built the first time the catalog or a block layout is needed
+    @property
+    def index(self):
+        if self.file_index is None:
+            self.file_index = FileIndex(self.bp_file, self.io)
+        return self.file_index
+
+    # Metadata of all variables: type, shape, steps, minimum and maximum, as strings
+    @property
+    def variables(self):
+        return self.index.variables
+
+    def variable(self, var_name):
+        var = self.io.InquireVariable(var_name)
+        # The bindings return an empty variable instead of None for unknown names
+        if not var:
+            raise ValueError("Variable " + var_name + " not found")
+        return var
+
+    def steps(self, var_name):
+        return int(self.variable(var_name).Steps())
+
+    # Shape of a variable, or the count of one of its writer blocks at a step for local arrays
+    def shape(self, var_name, block=None, step=0):
+        return [int(i) for i in var_shape(self.fr, self.variable(var_name), block, step)]
+
+    # Blocks of a variable at every step, with their starts, counts, minima and maxima
+    def blocks(self, var_name):
+        return self.index.blocks(self.fr, var_name)
+
+    # Selection start and count of a variable, by default zeros and the rest of the variable or block
+    def selection(self, var_name, start=None, count=None, block=None, step=0):
+        var = self.variable(var_name)
+        if is_local_array(var) and block is None:
+            raise ValueError(var_name + " is a local array, a writer block must be given")
+        shape = np.array(var_shape(self.fr, var, block, step), dtype=int)
+        sel_start = np.array(start, dtype=int) if start is not None else np.zeros(len(shape), dtype=int)
+        sel_count = np.array(count, dtype=int) if count is not None else shape - sel_start
+        check_selection(var_name, sel_start, sel_count, shape)
+        return sel_start, sel_count
+
+    # Read steps of a selection, see step_range for the steps. A single step is returned as a [*count] array,
+    # other steps as a [steps, *count] array.
+    def read(self, var_name, steps=None, start=None, count=None, block=None):
+        var = self.variable(var_name)
+        step_start, step_count, single = step_range(steps, int(var.Steps()))
+        sel_start, sel_count = self.selection(var_name, start, count, block, step_start)
+        data_shape = [int(c) for c in sel_count]
+        if single:
+            key = (var_name, step_start, tuple(data_shape), tuple(int(i) for i in sel_start), block)
+            cached = self.cache.get(key) if self.cache.budget else None
+            if cached is not None:
+                return cached[0]
+            with tracer.attribute(self.stats):
+                data = read_step(self.fr, var, step_start, sel_start, sel_count, data_shape, block)
+            if data.nbytes <= self.cache.budget:
+                data.flags.writeable = False
+                self.cache.put(key, (data,))
+            return data
+
+        check_read_budget([step_count] + data_shape, var_dtype(var))
+        data = np.empty([step_count] + data_shape, dtype=var_dtype(var))
+        with tracer.attribute(self.stats):
+            for _ in read_steps(self.fr, var, step_start, step_count, sel_start, sel_count, data_shape, block, data):
+                pass
+        return data
+
+    # Read steps of a selection in batches and yield each step with its array, a view of its batch
+    def iter_steps(self, var_name, steps=None, start=None, count=None, block=None):
+        var = self.variable(var_name)
+        step_start, step_count, _ = step_range(steps, int(var.Steps()))
+        sel_start, sel_count = self.selection(var_name, start, count, block, step_start)
+        values = iter_steps(self.fr, var, step_start, step_count, sel_start, sel_count, [int(c) for c in sel_count], block)
+        for step in range(step_start, step_start + step_count):
+            # Only the reads are attributed to the reader, not what the caller does between the steps
+            with tracer.attribute(self.stats):
+                data = next(values)
+            yield step, data
+
+    # Write the index if it changed and close the engine
+    def close(self):
+        if self.file_index is not None:
+            self.file_index.save()
+        self.cache.clear()
+        self.fr.Close()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# Write steps of a small simulation into a BP5 file or an SST stream, to try "bpview.py --follow" on one machine:
+#   python3 stream_writer.py -o live.bp &
+#   python3 bpview.py -b live.bp --follow
+# or with SST, starting the writer first:
+#   python3 stream_writer.py -o live --engine SST &
+#   python3 bpview.py -b live --follow --engine SST
+import argparse
+import time
+import numpy as np
+import adios2
+
+
+def write_steps(output, engine, steps, interval, nx, ny):
+    adios = adios2.ADIOS()
+    io = adios.DeclareIO("StreamWriter")
+    io.SetEngine(engine)
+    if engine.upper() == "SST":
+        # Do not wait for a reader, and drop steps no reader takes instead of blocking the simulation
+        io.SetParameters({"RendezvousReaderCount": "0", "QueueLimit": "4", "QueueFullPolicy": "Discard"})
+
+    # A moving wave on a 2D grid, a cut through it and the time of the step
+    field = io.DefineVariable("field", np.zeros(1), [nx, ny], [0, 0], [nx, ny], adios2.ConstantDims)
+    profile = io.DefineVariable("profile", np.zeros(1), [nx], [0], [nx], adios2.ConstantDims)
+    sim_time = io.DefineVariable("time", np.zeros(1))
+
+    x = np.linspace(0, 2 * np.pi, nx)[:, np.newaxis]
+    y = np.linspace(0, 2 * np.pi, ny)[np.newaxis, :]
+
+    fw = io.Open(output, adios2.Mode.Write)
+    for step in range(steps):
+        t = step * 0.1
+        data = np.sin(x - t) * np.cos(y + 0.5 * t)
+
+        fw.BeginStep()
+        fw.Put(field, np.ascontiguousarray(data), adios2.Mode.Sync)
+        fw.Put(profile, np.ascontiguousarray(data[:, ny // 2]), adios2.Mode.Sync)
+        fw.Put(sim_time, np.array([t]), adios2.Mode.Sync)
+        fw.EndStep()
+
+        print("Wrote step " + str(step))
+        time.sleep(interval)
+    fw.Close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", "-o", default="live.bp", help="Path of the BP5 file or name of the SST stream")
+    parser.add_argument("--engine", default="BP5", help="BP5 or SST")
+    parser.add_argument("--steps", type=int, default=1000, help="Number of steps to write")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between steps")
+    parser.add_argument("--nx", type=int, default=256, help="First dimension of the field")
+    parser.add_argument("--ny", type=int, default=128, help="Second dimension of the field")
+    args = parser.parse_args()
+
+    write_steps(args.output, args.engine, args.steps, args.interval, args.nx, args.ny)
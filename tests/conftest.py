@@ -0,0 +1,66 @@
+# Small BP files written into a temporary directory for the tests, and settings that keep the tests from
+# writing indexes into the home directory or needing a display
+import os
+import sys
+import numpy as np
+import pytest
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import adios2  # noqa: E402
+import bpview_reader  # noqa: E402
+
+STEPS = 3
+SHAPE = [20, 12, 6]
+
+
+# Values of G at a step: its position in the array plus 1000 per step
+def global_values(step):
+    return np.arange(np.prod(SHAPE), dtype=np.float64).reshape(SHAPE) + 1000 * step
+
+
+# Values of writer block b of the local array L at a step
+def local_values(step, block):
+    return np.arange(8, dtype=np.float64) + 100 * block + 10 * step
+
+
+# Write G in two blocks along its first dimension, the local array L in two blocks and the scalar s
+def write_file(path, engine):
+    adios = adios2.ADIOS()
+    io = adios.DeclareIO("Test" + engine)
+    io.SetEngine(engine)
+    g = io.DefineVariable("G", np.zeros(1), SHAPE, [0, 0, 0], SHAPE)
+    local = io.DefineVariable("L", np.zeros(1), [], [], [8])
+    scalar = io.DefineVariable("s", np.zeros(1, dtype=np.int32))
+    fw = io.Open(path, adios2.Mode.Write)
+    for step in range(STEPS):
+        fw.BeginStep()
+        data = global_values(step)
+        for first, last in [(0, 10), (10, 20)]:
+            g.SetSelection([[first, 0, 0], [last - first] + SHAPE[1:]])
+            fw.Put(g, np.ascontiguousarray(data[first:last]), adios2.Mode.Sync)
+        for block in range(2):
+            fw.Put(local, local_values(step, block), adios2.Mode.Sync)
+        fw.Put(scalar, np.array([step], dtype=np.int32), adios2.Mode.Sync)
+        fw.EndStep()
+    fw.Close()
+    return path
+
+
+@pytest.fixture(scope="session")
+def bp_files(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("bp")
+    return {engine: write_file(str(directory / (engine.lower() + ".bp")), engine) for engine in ["BP3", "BP4", "BP5"]}
+
+
+@pytest.fixture(params=["BP3", "BP4", "BP5"])
+def bp_file(request, bp_files):
+    return bp_files[request.param]
+
+
+@pytest.fixture(autouse=True)
+def index_dir(tmp_path, monkeypatch):
+    directory = str(tmp_path / "index")
+    monkeypatch.setattr(bpview_reader, "index_dir", directory)
+    return directory
@@ -0,0 +1,169 @@
+import os
+import numpy as np
+import pytest
+import bpview_reader
+from bpview_reader import BPViewReader, ReadBudgetError, block_box, check_selection, step_range
+from conftest import STEPS, SHAPE, global_values, local_values
+
+
+def test_check_selection():
+    check_selection("G", [0, 0, 0], SHAPE, SHAPE)
+    check_selection("G", [19, 11, 5], [1, 1, 1], SHAPE)
+    with pytest.raises(ValueError, match="dimensions"):
+        check_selection("G", [0, 0], [1, 1], SHAPE)
+    with pytest.raises(ValueError, match="outside"):
+        check_selection("G", [0, 0, 0], [21, 1, 1], SHAPE)
+    with pytest.raises(ValueError, match="outside"):
+        check_selection("G", [-1, 0, 0], [1, 1, 1], SHAPE)
+    with pytest.raises(ValueError, match="outside"):
+        check_selection("G", [0, 0, 0], [0, 1, 1], SHAPE)
+
+
+def test_step_range():
+    assert step_range(None, 5) == (0, 5, False)
+    assert step_range(2, 5) == (2, 1, True)
+    assert step_range(-1, 5) == (4, 1, True)
+    assert step_range(range(1, 4), 5) == (1, 3, False)
+    assert step_range(slice(2, None), 5) == (2, 3, False)
+    for steps in [5, -6, range(0, 4, 2), range(3, 6)]:
+        with pytest.raises(ValueError):
+            step_range(steps, 5)
+
+
+def test_block_box():
+    assert block_box({"Start": "0,10", "Count": "5,2"}) == ([0, 10], [5, 2])
+    # Local array blocks have no start and scalars neither start nor count
+    assert block_box({"Start": "", "Count": "8"}) == ([0], [8])
+    assert block_box({"Start": "", "Count": ""}) == ([], [])
+
+
+def test_read(bp_file):
+    with BPViewReader(bp_file) as reader:
+        assert sorted(reader.variables) == ["G", "L", "s"]
+        assert reader.shape("G") == SHAPE
+        assert reader.steps("G") == STEPS
+
+        data = reader.read("G", 1)
+        assert data.dtype == np.float64
+        np.testing.assert_array_equal(data, global_values(1))
+
+        box = reader.read("G", range(1, 3), [2, 3, 4], [5, 1, 2])
+        assert box.shape == (2, 5, 1, 2)
+        for i, step in enumerate(range(1, 3)):
+            np.testing.assert_array_equal(box[i], global_values(step)[2:7, 3:4, 4:6])
+
+        everything = reader.read("G")
+        assert everything.shape == tuple([STEPS] + SHAPE)
+        np.testing.assert_array_equal(everything[-1], reader.read("G", -1))
+
+        assert reader.read("s", 2) == 2
+        assert reader.read("s", 2).dtype == np.int32
+        np.testing.assert_array_equal(reader.read("L", 1, block=1), local_values(1, 1))
+        assert reader.shape("L", 1) == [8]
+
+        for step, values in reader.iter_steps("G", range(0, STEPS), [0, 0, 0], [1, 1, 6]):
+            np.testing.assert_array_equal(values, global_values(step)[:1, :1, :])
+
+
+def test_read_errors(bp_files):
+    with BPViewReader(bp_files["BP5"]) as reader:
+        with pytest.raises(ValueError, match="not found"):
+            reader.read("missing")
+        with pytest.raises(ValueError, match="local array"):
+            reader.read("L", 0)
+        with pytest.raises(ValueError, match="outside"):
+            reader.read("G", 0, [10, 0, 0], [11, 1, 1])
+        with pytest.raises(ValueError, match="outside"):
+            reader.read("G", STEPS)
+
+
+def test_read_budget(bp_files, monkeypatch):
+    monkeypatch.setattr(bpview_reader, "read_budget", 1024)
+    with BPViewReader(bp_files["BP5"]) as reader:
+        with pytest.raises(ReadBudgetError):
+            reader.read("G", 0)
+        assert reader.read("G", 0, [0, 0, 0], [1, 1, 6]).shape == (1, 1, 6)
+
+
+# Batches smaller than the step range are read into the rows of one array
+def test_batched_read(bp_files, monkeypatch):
+    monkeypatch.setattr(bpview_reader, "batch_budget", np.prod(SHAPE) * 8)
+    with BPViewReader(bp_files["BP5"]) as reader:
+        data = reader.read("G")
+        assert data.flags.owndata
+        for step in range(STEPS):
+            np.testing.assert_array_equal(data[step], global_values(step))
+
+
+def test_cache(bp_files):
+    with BPViewReader(bp_files["BP5"], cache_budget=2**20) as reader:
+        first = reader.read("G", 1)
+        assert reader.read("G", 1) is first
+        assert not first.flags.writeable
+        assert reader.read("G", 1, [0, 0, 0], [1, 1, 1]) is not first
+        assert reader.stats.cache_hits == 1
+    with BPViewReader(bp_files["BP5"]) as reader:
+        assert reader.read("G", 1).flags.writeable
+
+
+def test_strided_read(bp_files):
+    with BPViewReader(bp_files["BP5"]) as reader:
+        var = reader.variable("G")
+        data = bpview_reader.read_step_strided(reader.fr, var, 2, np.array([1, 0, 3]), np.array([15, 12, 1]), [0, 1], [4, 5])
+        np.testing.assert_array_equal(data, global_values(2)[1:16:4, 0:12:5, 3])
+
+
+def test_block_layout(bp_file):
+    with BPViewReader(bp_file) as reader:
+        layout = reader.blocks("G")
+        assert layout.step_count() == STEPS
+        assert layout.counts.tolist()[:2] == [[10, 12, 6], [10, 12, 6]]
+        assert layout.starts.tolist()[:2] == [[0, 0, 0], [10, 0, 0]]
+        assert layout.intersecting(0, [12, 0, 0], [1, 1, 1]).tolist() == [False, True]
+        mins, maxs = layout.selection_minmax(0, STEPS, [0, 0, 0], [1, 1, 1])
+        np.testing.assert_array_equal(mins, [global_values(step)[:10].min() for step in range(STEPS)])
+        np.testing.assert_array_equal(maxs, [global_values(step)[:10].max() for step in range(STEPS)])
+        step_mins, step_maxs = layout.step_minmax()
+        np.testing.assert_array_equal(step_maxs, [global_values(step).max() for step in range(STEPS)])
+
+        local = reader.blocks("L")
+        assert local.starts.tolist()[:2] == [[0], [0]]
+        assert local.counts.tolist()[:2] == [[8], [8]]
+        mins, maxs = local.selection_minmax(0, STEPS, [0], [8], block=1)
+        np.testing.assert_array_equal(maxs, [local_values(step, 1).max() for step in range(STEPS)])
+
+        # Scalars have an empty count in BP3/BP4 and a count of one value in BP5
+        scalar = reader.blocks("s")
+        assert scalar.step_count() == STEPS
+        assert scalar.counts.shape[1] <= 1
+
+
+def test_file_index(bp_files, index_dir, monkeypatch):
+    # The key of a BP3 file is its own size and time, of a BP4/BP5 directory those of its metadata files
+    with BPViewReader(bp_files["BP3"]) as reader:
+        assert [name for name, _, _ in reader.index.key] == [""]
+    with BPViewReader(bp_files["BP5"]) as reader:
+        names = [name for name, _, _ in reader.index.key]
+        assert names and all(name.startswith(("md.", "mmd.")) for name in names)
+        reader.blocks("G")
+    assert len(os.listdir(index_dir)) == 2
+
+    # Reopening reads the catalog and the block layouts from the index
+    with BPViewReader(bp_files["BP5"]) as reader:
+        assert reader.index.load() is not None
+        assert "G" in reader.index.layouts
+        assert reader.blocks("G").step_count() == STEPS
+
+    monkeypatch.setattr(bpview_reader, "index_dir", None)
+    for bp_file in bp_files.values():
+        with BPViewReader(bp_file) as reader:
+            assert reader.index.key is None
+            assert sorted(reader.variables) == ["G", "L", "s"]
+
+
+def test_index_rebuilt_on_change(bp_files):
+    with BPViewReader(bp_files["BP3"]) as reader:
+        index = reader.index
+        assert index.load() is not None
+        index.key = [("", -1, -1)]
+        assert index.load() is None
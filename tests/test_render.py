@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+import bpview
+from conftest import SHAPE, global_values
+
+
+# Color limits and y-axis limits of the rendered frames, by step
+@pytest.fixture
+def frame_limits(monkeypatch):
+    limits = {}
+    save_frame = bpview.save_frame
+
+    def recording_save_frame(fig, prefix, step):
+        ax = fig.axes[0]
+        limits[step] = ax.images[0].get_clim() if ax.images else ax.get_ylim()
+        return save_frame(fig, prefix, step)
+
+    monkeypatch.setattr(bpview, "save_frame", recording_save_frame)
+    return limits
+
+
+def test_render_global_scale(bp_files, tmp_path, frame_limits):
+    sel_count = np.array([SHAPE[0], SHAPE[1], 1])
+    # A part of the series rendered by one process of a pool keeps the limits of the whole series
+    frames = bpview.render_frames(bp_files["BP5"], "G", 1, 2, np.zeros(3, dtype=int), sel_count, str(tmp_path),
+                                  scale="global", series=(0, 3))
+    assert len(frames) == 2
+    assert frame_limits[1] == frame_limits[2] == (global_values(0).min(), global_values(2).max())
+
+
+def test_render_step_scale(bp_files, tmp_path, frame_limits):
+    sel_count = np.array([SHAPE[0], SHAPE[1], 1])
+    bpview.render_frames(bp_files["BP5"], "G", 0, 3, np.zeros(3, dtype=int), sel_count, str(tmp_path), scale="step")
+    for step in range(3):
+        assert frame_limits[step] == (global_values(step)[:, :, 0].min(), global_values(step)[:, :, 0].max())
+
+
+def test_render_1d_global_scale(bp_files, tmp_path, frame_limits):
+    bpview.render_frames(bp_files["BP5"], "G", 0, 3, np.zeros(3, dtype=int), np.array([SHAPE[0], 1, 1]), str(tmp_path))
+    assert frame_limits[0] == frame_limits[2] == (global_values(0).min(), global_values(2).max())
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+import matplotlib.pyplot as plt
+import bpview
+from bpview_reader import BPViewReader
+from conftest import STEPS, SHAPE, global_values
+
+
+def test_moments_merge():
+    rng = np.random.default_rng(1)
+    values = rng.normal(3, 2, 10000)
+    moments = bpview.Moments()
+    for chunk in np.array_split(values, 7):
+        part = bpview.Moments()
+        part.add(chunk)
+        moments.merge(part)
+    moments.add(np.empty(0))
+    assert moments.count == len(values)
+    assert moments.mean == pytest.approx(values.mean())
+    assert moments.std() == pytest.approx(values.std())
+    assert (moments.min, moments.max) == (values.min(), values.max())
+
+
+def test_tdigest_quantiles():
+    rng = np.random.default_rng(2)
+    values = rng.normal(0, 1, 200000)
+    digest = bpview.TDigest()
+    for chunk in np.array_split(values, 20):
+        part = bpview.TDigest()
+        part.add(chunk)
+        digest.merge(part)
+    assert len(digest.means) < 1000
+    for q in [0.01, 0.25, 0.5, 0.75, 0.99]:
+        assert digest.quantile(q) == pytest.approx(np.quantile(values, q), abs=0.02)
+    assert digest.quantile(0) == values.min()
+    assert digest.quantile(1) == values.max()
+    assert np.isnan(bpview.TDigest().quantile(0.5))
+
+
+def test_statistics_counts_and_norms():
+    data = np.array([[1.0, np.nan, 3.0], [np.inf, -4.0, 0.0]])
+    stats = bpview.Statistics()
+    stats.add(5, data[:1])
+    other = bpview.Statistics()
+    other.add(6, data[1:])
+    stats.merge(other)
+    assert (stats.nan_count, stats.inf_count, stats.moments.count) == (1, 1, 4)
+    assert stats.moments.mean == pytest.approx(0.0)
+    steps, l2, largest = stats.norms()
+    assert steps.tolist() == [5, 6]
+    np.testing.assert_allclose(l2, [np.sqrt(10), 4])
+    np.testing.assert_allclose(largest, [3, 4])
+    assert stats.lines()[0] == "Values: 6"
+
+
+def test_statistics_complex_magnitude():
+    stats = bpview.Statistics()
+    stats.add(0, np.array([[3 + 4j, 0j]]))
+    assert stats.moments.max == 5
+
+
+def test_reduce_variable(bp_files):
+    with BPViewReader(bp_files["BP5"]) as reader:
+        var = reader.variable("G")
+        stats = bpview.reduce_variable(reader.fr, var, 0, STEPS, np.zeros(3, dtype=int), np.array(SHAPE), threads=2)
+    values = np.stack([global_values(step) for step in range(STEPS)])
+    assert stats.moments.count == values.size
+    assert stats.moments.mean == pytest.approx(values.mean())
+    assert stats.moments.std() == pytest.approx(values.std())
+    np.testing.assert_allclose(stats.norms()[1], [np.linalg.norm(values[step]) for step in range(STEPS)])
+
+
+def test_minmax_indices_keeps_extremes():
+    rng = np.random.default_rng(3)
+    y = rng.normal(0, 1, 10001)
+    y[1234] = 50
+    y[8765] = -50
+    keep = bpview.minmax_indices([y], 100)
+    assert len(keep) <= 2 * 100 + 4
+    assert {0, 1234, 8765, len(y) - 1} <= set(keep.tolist())
+    assert np.all(np.diff(keep) > 0)
+    # Short lines are kept whole
+    assert bpview.minmax_indices([y[:50]], 100).tolist() == list(range(50))
+
+
+def test_decimated_line():
+    fig, ax, line, title = bpview.make_1d_figure("x", "y")
+    x = np.arange(100000)
+    y = np.sin(x / 1000.0)
+    y[4242] = 7
+    decimated = bpview.DecimatedLine(None, ax, line)
+    decimated.set_data(x, y)
+    shown_x, shown_y = line.get_data()
+    assert len(shown_x) < len(x) // 10
+    assert shown_y.max() == 7
+    assert (shown_x[0], shown_x[-1]) == (0, len(x) - 1)
+    plt.close(fig)
+
+
+def test_paged_selection(bp_files):
+    with BPViewReader(bp_files["BP5"]) as reader:
+        var = reader.variable("G")
+        paged = bpview.PagedSelection(reader.fr, var, 1, 2, np.array([0, 0, 0]), np.array(SHAPE))
+        assert paged.rows == 2 * SHAPE[0] * SHAPE[1]
+        assert paged.cols == SHAPE[2]
+        # Rows continue into the second step after the rows of the first one
+        row = SHAPE[0] * SHAPE[1] + 13
+        data = paged.get(row, 3, 2, 4)
+        expected = global_values(2).reshape(-1, SHAPE[2])[13:16, 2:6]
+        np.testing.assert_array_equal(data, expected)
+        lines = paged.lines(row, 2, data)
+        assert lines[0].startswith("step 2 [1, 1, 2]: ")